@@ -0,0 +1 @@
+../../../../lcdlib/charmap.py
\ No newline at end of file
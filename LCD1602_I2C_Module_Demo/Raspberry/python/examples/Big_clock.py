@@ -0,0 +1,38 @@
+import sys
+sys.path.append('../lib/')
+import LCD1602  # Import the LCD1602 module
+import time  # Import the time module for handling timing and local time
+from bigdigits import BigDigits  # Two-row digits from custom block glyphs
+from timeline import Timeline  # Frame scheduler shared with lcdlib
+
+# Initialize the LCD display with 16 columns and 2 rows
+lcd = LCD1602.LCD1602(16, 2)
+
+# Initialize the backlight using the SN3193 module
+led = LCD1602.SN3193()
+
+# Set the backlight brightness to 50% (range: 0~100)
+led.set_brightness(50)
+
+# Upload the block glyphs once; they use all 8 custom character slots
+big = BigDigits(lcd)
+
+# Wake once at the start of every second instead of polling
+timeline = Timeline(1.0, align=True)
+
+try:
+    for _ in timeline.frames():
+        # Get the current local time
+        T = time.localtime()
+
+        # Hours and minutes in big digits, the colon blinking every second.
+        # Only the cells that changed are sent, a few bytes per second
+        colon = ':' if T.tm_sec % 2 == 0 else ' '
+        big.draw(0, "{:02}{}{:02}".format(T.tm_hour, colon, T.tm_min))
+        lcd.flush()
+
+except KeyboardInterrupt:  # Handle user interruption (Ctrl+C)
+    # Clear the LCD display
+    lcd.clear()
+    # Delete the LCD object to free resources
+    del lcd
@@ -2,6 +2,7 @@ import sys
 sys.path.append('../lib/')
 import LCD1602  # Import the LCD1602 module
 import time  # Import the time module for handling timing and local time
+from timeline import Timeline  # Frame scheduler shared with lcdlib
 
 # Initialize the LCD display with 16 columns and 2 rows
 lcd = LCD1602.LCD1602(16, 2)
@@ -15,8 +16,11 @@ led.set_brightness(50)
 # Uncomment the following line to enable breathing mode for the backlight
 # led.set_mode(LCD1602.LED_BREATH_MODE)
 
+# Wake once at the start of every second instead of polling
+timeline = Timeline(1.0, align=True)
+
 try:
-    while True:
+    for _ in timeline.frames():
         # Set the cursor to column 0, row 0
         lcd.setCursor(0, 0)
 
@@ -38,9 +42,6 @@ try:
         # Display the time (hours, minutes, seconds) on the second row
         lcd.printout(T[3] + ":" + T[4] + ":" + T[5])
 
-        # Pause for 0.1 seconds before updating the display
-        time.sleep(0.1)
-
 except KeyboardInterrupt:  # Handle user interruption (Ctrl+C)
     # Clear the LCD display
     lcd.clear()
@@ -0,0 +1 @@
+../../../../lcdlib/LCD1602.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../../lcdlib/bigdigits.py
\ No newline at end of file
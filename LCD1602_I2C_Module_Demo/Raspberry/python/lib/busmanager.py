@@ -0,0 +1 @@
+../../../../lcdlib/busmanager.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../../lcdlib/lcdbus.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../../lcdlib/panels.py
\ No newline at end of file
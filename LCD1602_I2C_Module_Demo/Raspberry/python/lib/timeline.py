@@ -0,0 +1 @@
+../../../../lcdlib/timeline.py
\ No newline at end of file
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Copies the shared driver from lcdlib/ into the Pico and ESP32 demo lib
+# folders. Files reach those boards through Thonny or mpremote cp, which
+# copy a symlink as a link or skip it, so these folders hold real copies.
+# Run this after changing lcdlib and commit the copies with the change.
+# The Raspberry Pi and Jetson folders link to lcdlib instead.
+#
+#   python3 sync_lib.py          update the copies
+#   python3 sync_lib.py --check  exit 1 if a copy differs from lcdlib
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LCDLIB = os.path.join(HERE, '..', 'lcdlib')
+
+BOARDS = ['Pico', 'esp32']  # MicroPython boards
+MODULES = ['LCD1602.py', 'lcdbus.py']  # What the MicroPython demos import
+
+
+def stale():
+    for board in BOARDS:
+        for module in MODULES:
+            src = os.path.join(LCDLIB, module)
+            dst = os.path.join(HERE, board, 'python', 'lib', module)
+            if os.path.islink(dst) or not os.path.exists(dst) \
+                    or not filecmp.cmp(src, dst, shallow=False):
+                yield src, dst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy lcdlib into the MicroPython demo folders")
+    parser.add_argument('--check', action='store_true', help="only report copies that are out of date")
+    args = parser.parse_args()
+
+    changed = list(stale())
+    for src, dst in changed:
+        name = os.path.relpath(dst, HERE)
+        if args.check:
+            print(f"out of date: {name}")
+            continue
+        if os.path.islink(dst):
+            os.unlink(dst)  # Copying onto the link would write into lcdlib
+        shutil.copyfile(src, dst)
+        print(f"updated {name}")
+    if args.check and changed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
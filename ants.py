@@ -1,11 +1,30 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
 import random
+import struct
+import subprocess
 import pygame
 import sys
+import time
+import zlib
 from collections import deque
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # Only the pheromone forager AI needs numpy
+    np = None
 
 # === Game Settings ===
 MAP_WIDTH, MAP_HEIGHT = 24, 17  # One less row to make space for the legend area
 TILE_SIZE = 48
+VIEW_WIDTH, VIEW_HEIGHT = 24, 17  # Window size in tiles; larger maps scroll under the camera
+CHUNK_SIZE = 32  # World chunks are CHUNK_SIZE x CHUNK_SIZE tiles, allocated on first write
+BFS_MAX_RADIUS = 48  # Pathfinding gives up beyond this Manhattan distance
+MAP_TOP = TILE_SIZE + 12  # Screen y where the map view starts, below the labels
 NUM_FOOD = 40
 NUM_OBSTACLES = 24
 MAX_ANTS = 30
@@ -16,6 +35,30 @@ DAMAGE = 1
 FPS = 6  # Slowed down by 5 times (original was 30)
 MOVE_FRAMES = 6
 
+# === Forager AI Settings ===
+FORAGER_AI = 'bfs'  # 'bfs' (shortest path to food) or 'pheromone' (follow scent gradients)
+PHEROMONE_EVAPORATION = 0.8  # Fraction of scent kept each tick
+PHEROMONE_DIFFUSION = 0.9  # Fraction of a tile's scent shared with its 4 neighbours each tick
+FOOD_SCENT = 1.0  # Scent emitted by every food tile each tick
+TRAIL_DEPOSIT = 1.0  # Trail laid by a forager where it finds food, fading back along its route
+TRAIL_LENGTH = 24  # Tiles of its route a forager marks when it finds food
+TRAIL_FADE = 0.85  # Fraction of the deposit laid on each tile further back along the route
+PHEROMONE_FLOOR = 1e-4  # Scent below this is treated as none; empty chunks are freed
+PHEROMONE_EXPLORE = 0.05  # Chance a forager takes a random step instead of climbing the gradient
+PHEROMONE_MEMORY = 6  # Recently visited tiles a forager avoids stepping back onto
+
+# === Parallel Tick Settings ===
+WORKERS = 0  # Processes planning moves in parallel; 0 runs the classic serial tick
+BANDS_PER_WORKER = 4  # Map bands per worker, dealt out in turn so a crowded area is shared out
+REGION_MIN_ROWS = 2  # Thinnest band handed to a worker
+
+# === Profiler Settings ===
+PROFILE_WINDOW = 60  # Frames averaged by the performance HUD (F3)
+
+# === Replay Settings ===
+SEED = None  # None picks a fresh seed each run (it is still stored in recordings)
+KEYFRAME_INTERVAL = 50  # Ticks between full state snapshots in a recording
+
 # === Symbols ===
 EMPTY, FOOD, OBSTACLE = '.', 'F', '#'
 ALLY_COLONY, ENEMY_COLONY = 'C', 'X'
@@ -32,20 +75,232 @@ COLORS = {
     WARRIOR: (0, 0, 255)
 }
 
-# === Initialize pygame ===
-pygame.init()
-screen = pygame.display.set_mode((MAP_WIDTH * TILE_SIZE, (MAP_HEIGHT + 1) * TILE_SIZE + 60))
-pygame.display.set_caption("Ant Bot Simulation")
-font = pygame.font.SysFont(None, 28)
-clock = pygame.time.Clock()
+# All randomness goes through this generator so a seed reproduces a game
+rng = random.Random()
+recorder = None
+pheromones = None
+planner = None
+
+# === Profiler ===
+class TickProfiler:
+    """Wall-clock time spent in each phase of every frame.
+
+    'move' covers the whole ant update, so it includes the 'bfs' and 'attack'
+    time spent inside it; 'plan' is the parallel planner's share of a tick.
+    Simulation phases are only non-zero on frames that ran a tick.
+    """
+
+    PHASES = ('pheromones', 'plan', 'move', 'bfs', 'attack', 'spawn', 'draw_grid', 'draw_ants', 'flip')
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.records = []
+        self.recent = deque(maxlen=window)
+        self.timers = {name: PhaseTimer(self, name) for name in self.PHASES}
+        self.frame_start = time.perf_counter()
+        self.reset_frame()
+
+    def reset_frame(self):
+        self.frame = dict.fromkeys(self.PHASES, 0.0)
+        self.frame['bfs_nodes'] = 0
+
+    def phase(self, name):
+        return self.timers[name]
+
+    def end_frame(self, frame, tick, simulated):
+        now = time.perf_counter()
+        record = {'frame': frame, 'tick': tick, 'simulated': simulated}
+        record.update(self.frame)
+        record['total'] = now - self.frame_start
+        self.frame_start = now
+        self.records.append(record)
+        self.recent.append(record)
+        self.reset_frame()
+
+    def averages(self):
+        """Mean seconds per phase: per simulated tick for the simulation, per frame for drawing."""
+        frames = list(self.recent)
+        ticks = [r for r in frames if r['simulated']] or [{}]
+        result = {}
+        for name in self.PHASES + ('bfs_nodes', 'total'):
+            rows = frames if name.startswith(('draw', 'flip', 'total')) else ticks
+            result[name] = sum(r.get(name, 0) for r in rows) / max(len(rows), 1)
+        return result
+
+    def hud_lines(self):
+        avg = self.averages()
+        ms = {name: avg[name] * 1000 for name in self.PHASES + ('total',)}
+        lines = [f"frame {ms['total']:6.1f} ms  ({1000 / ms['total'] if ms['total'] else 0:4.1f} fps)",
+                 f"tick:  move {ms['move']:6.2f} ms",
+                 f"         bfs {ms['bfs']:6.2f}  attack {ms['attack']:5.2f}",
+                 f"         bfs nodes {avg['bfs_nodes']:8.0f}",
+                 f"         spawn {ms['spawn']:5.2f}"]
+        if ms['plan']:
+            lines.append(f"         plan {ms['plan']:6.2f}")
+        if ms['pheromones']:
+            lines.append(f"         pheromones {ms['pheromones']:5.2f}")
+        lines += [f"draw:  grid {ms['draw_grid']:6.2f}  ants {ms['draw_ants']:5.2f}",
+                  f"flip:  {ms['flip']:6.2f} ms"]
+        return lines
+
+    def export(self, path):
+        """Write every frame record as JSON (by extension) or CSV, times in milliseconds."""
+        timed = self.PHASES + ('total',)
+        rows = [{key: round(value * 1000, 4) if key in timed else value for key, value in record.items()}
+                for record in self.records]
+        with open(path, 'w', newline='') as f:
+            if path.lower().endswith('.json'):
+                json.dump(rows, f, indent=1)
+            else:
+                writer = csv.DictWriter(f, fieldnames=['frame', 'tick', 'simulated', *self.PHASES, 'bfs_nodes', 'total'])
+                writer.writeheader()
+                writer.writerows(rows)
+
+class PhaseTimer:
+    # One reusable context manager per phase keeps the timing overhead to two
+    # perf_counter() calls
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.frame[self.name] += time.perf_counter() - self.start
+
+profiler = TickProfiler()
+
+# === Display ===
+def init_display(headless=False):
+    global screen, font, hud_font, clock, camera
+    if headless:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    view_height = min(MAP_HEIGHT, VIEW_HEIGHT) * TILE_SIZE
+    screen = pygame.display.set_mode((VIEW_WIDTH * TILE_SIZE, view_height + TILE_SIZE + 60))
+    pygame.display.set_caption("Ant Bot Simulation")
+    font = pygame.font.SysFont(None, 28)
+    hud_font = pygame.font.SysFont(None, 22)
+    clock = pygame.time.Clock()
+    camera = Camera(VIEW_WIDTH * TILE_SIZE, view_height)
+
+# === World ===
+class World:
+    """Tile map stored as lazily allocated chunks.
+
+    Reading a tile in a chunk that was never written returns EMPTY, so memory
+    and per-tick cost follow what is on the map rather than its area.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.chunks = {}
+        self.mirror = None
+
+    def get(self, x, y):
+        chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        if chunk is None:
+            return EMPTY
+        return chunk[(y % CHUNK_SIZE) * CHUNK_SIZE + x % CHUNK_SIZE]
+
+    def set(self, x, y, symbol):
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if symbol == EMPTY:
+                return
+            chunk = self.chunks[key] = [EMPTY] * (CHUNK_SIZE * CHUNK_SIZE)
+        chunk[(y % CHUNK_SIZE) * CHUNK_SIZE + x % CHUNK_SIZE] = symbol
+        if self.mirror is not None:
+            self.mirror[y * self.width + x] = 0 if symbol == EMPTY else ord(symbol)
+
+    def attach_mirror(self, buffer):
+        """Keep a flat byte-per-tile copy of the map in `buffer` (EMPTY is 0)."""
+        self.mirror = buffer
+        for (cx, cy), chunk in self.chunks.items():
+            for i, symbol in enumerate(chunk):
+                if symbol != EMPTY:
+                    x, y = cx * CHUNK_SIZE + i % CHUNK_SIZE, cy * CHUNK_SIZE + i // CHUNK_SIZE
+                    buffer[y * self.width + x] = ord(symbol)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def chunks_in(self, x0, y0, x1, y1):
+        """Yield (origin_x, origin_y, chunk) for allocated chunks overlapping the tile box."""
+        for cy in range(y0 // CHUNK_SIZE, y1 // CHUNK_SIZE + 1):
+            for cx in range(x0 // CHUNK_SIZE, x1 // CHUNK_SIZE + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is not None:
+                    yield cx * CHUNK_SIZE, cy * CHUNK_SIZE, chunk
+
+# === Camera ===
+class Camera:
+    def __init__(self, view_width, view_height):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.x = self.y = 0.0  # Top-left corner of the view in unzoomed map pixels
+        self.zoom = 1.0
+
+    @property
+    def tile(self):
+        return TILE_SIZE * self.zoom
+
+    def pan(self, dx, dy):
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, sx, sy):
+        # Keep the map point under the cursor fixed while zooming
+        mx, my = self.x + sx / self.zoom, self.y + sy / self.zoom
+        self.zoom = max(0.05, min(2.0, self.zoom * factor))
+        self.x, self.y = mx - sx / self.zoom, my - sy / self.zoom
+        self.clamp()
+
+    def clamp(self):
+        self.x = max(0.0, min(self.x, MAP_WIDTH * TILE_SIZE - self.view_width / self.zoom))
+        self.y = max(0.0, min(self.y, MAP_HEIGHT * TILE_SIZE - self.view_height / self.zoom))
+
+    def center_on(self, x, y):
+        self.x = (x + 0.5) * TILE_SIZE - self.view_width / self.zoom / 2
+        self.y = (y + 0.5) * TILE_SIZE - self.view_height / self.zoom / 2
+        self.clamp()
+
+    def visible_tiles(self):
+        tile = self.tile
+        x0, y0 = int(self.x * self.zoom // tile), int(self.y * self.zoom // tile)
+        x1 = min(MAP_WIDTH - 1, int((self.x * self.zoom + self.view_width) // tile))
+        y1 = min(MAP_HEIGHT - 1, int((self.y * self.zoom + self.view_height) // tile))
+        return x0, y0, x1, y1
+
+    def to_screen(self, x, y):
+        return (x * TILE_SIZE - self.x) * self.zoom, (y * TILE_SIZE - self.y) * self.zoom + MAP_TOP
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEWHEEL:
+            sx, sy = pygame.mouse.get_pos()
+            self.zoom_at(1.25 if event.y > 0 else 0.8, sx, sy - MAP_TOP)
+        elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+            self.pan(-event.rel[0], -event.rel[1])
+
+    def handle_keys(self):
+        keys = pygame.key.get_pressed()
+        step = TILE_SIZE / 2
+        dx = (keys[pygame.K_d] - keys[pygame.K_a]) * step
+        dy = (keys[pygame.K_s] - keys[pygame.K_w]) * step
+        if dx or dy:
+            self.pan(dx, dy)
 
 # === Game State ===
 def initialize_game():
-    global grid, food_positions, obstacles, allies, enemies, ally_colony, enemy_colony
-    global ally_score, enemy_score, ally_food_bank, enemy_food_bank
-    grid = [[EMPTY for _ in range(MAP_WIDTH)] for _ in range(MAP_HEIGHT)]
-    food_positions = []
+    global world, food_positions, obstacles, allies, enemies, ally_colony, enemy_colony
+    global ally_score, enemy_score, ally_food_bank, enemy_food_bank, pheromones
+    world = World(MAP_WIDTH, MAP_HEIGHT)
+    food_positions = set()
     obstacles = set()
+    pheromones = None
     allies = []
     enemies = []
     ally_colony = enemy_colony = None
@@ -53,101 +308,260 @@ def initialize_game():
     enemy_score = {'food': 0, 'kills': 0}
     ally_food_bank = enemy_food_bank = 0
     obstacles.update(place_random(OBSTACLE, NUM_OBSTACLES, []))
-    food_positions.extend(place_random(FOOD, NUM_FOOD, obstacles))
-    ally_colony = place_random(ALLY_COLONY, 1, food_positions + list(obstacles))[0]
-    enemy_colony = place_random(ENEMY_COLONY, 1, food_positions + list(obstacles) + [ally_colony])[0]
+    food_positions.update(place_random(FOOD, NUM_FOOD, obstacles))
+    ally_colony = place_random(ALLY_COLONY, 1, food_positions | obstacles)[0]
+    enemy_colony = place_random(ENEMY_COLONY, 1, food_positions | obstacles | {ally_colony})[0]
     spawn_ant(*ally_colony, allies, FORAGER)
     spawn_ant(*enemy_colony, enemies, FORAGER)
+    if FORAGER_AI == 'pheromone':
+        pheromones = PheromoneField(obstacles)
+        for x, y in food_positions:
+            pheromones.set_source(x, y, FOOD_SCENT)
+
+# === Pheromones ===
+class PheromoneField:
+    """Float scent grid, chunked like World and updated with numpy each tick.
+
+    Every tick the field evaporates and diffuses as a 5-point convolution over
+    the live chunks, stacked into one array so numpy does them all at once,
+    with the edge rows of neighbouring chunks as the halo.  Obstacles absorb
+    scent so gradients lead around them.  Chunks whose scent has died out are
+    dropped, so the cost follows the scented area only.
+    """
+
+    def __init__(self, obstacles):
+        self.chunks = {}
+        self.sources = {}
+        self.masks = {}
+        for x, y in obstacles:
+            key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+            if key not in self.masks:
+                self.masks[key] = np.ones((CHUNK_SIZE, CHUNK_SIZE), np.float32)
+            self.masks[key][y % CHUNK_SIZE, x % CHUNK_SIZE] = 0.0
+
+    def _chunk(self, table, x, y):
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        if key not in table:
+            table[key] = np.zeros((CHUNK_SIZE, CHUNK_SIZE), np.float32)
+        return table[key]
+
+    def get(self, x, y):
+        chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        if chunk is None:
+            return 0.0
+        return chunk[y % CHUNK_SIZE, x % CHUNK_SIZE]
+
+    def deposit(self, x, y, amount):
+        self._chunk(self.chunks, x, y)[y % CHUNK_SIZE, x % CHUNK_SIZE] += amount
+
+    def set_source(self, x, y, amount):
+        self._chunk(self.sources, x, y)[y % CHUNK_SIZE, x % CHUNK_SIZE] = amount
+
+    def step(self):
+        chunks, sources = self.chunks, self.sources
+        max_cx, max_cy = (MAP_WIDTH - 1) // CHUNK_SIZE, (MAP_HEIGHT - 1) // CHUNK_SIZE
+        # Scent spills into untouched neighbours of live chunks
+        live = set(sources)
+        for cx, cy in chunks:
+            live.update(((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)))
+        keys = [(cx, cy) for cx, cy in live if 0 <= cx <= max_cx and 0 <= cy <= max_cy]
+        if not keys:
+            self.chunks = {}
+            return
+
+        # One slice per chunk, plus a zero slice at the end for missing neighbours
+        count = len(keys)
+        index = {key: i for i, key in enumerate(keys)}
+        grid = np.zeros((count + 1, CHUNK_SIZE, CHUNK_SIZE), np.float32)
+        for key, chunk in chunks.items():
+            grid[index[key]] = chunk
+        up = [index.get((cx, cy - 1), count) for cx, cy in keys]
+        down = [index.get((cx, cy + 1), count) for cx, cy in keys]
+        left = [index.get((cx - 1, cy), count) for cx, cy in keys]
+        right = [index.get((cx + 1, cy), count) for cx, cy in keys]
+
+        padded = np.zeros((count, CHUNK_SIZE + 2, CHUNK_SIZE + 2), np.float32)
+        padded[:, 1:-1, 1:-1] = grid[:count]
+        padded[:, 0, 1:-1] = grid[up, -1]
+        padded[:, -1, 1:-1] = grid[down, 0]
+        padded[:, 1:-1, 0] = grid[left, :, -1]
+        padded[:, 1:-1, -1] = grid[right, :, 0]
+        share = PHEROMONE_DIFFUSION / 4
+        field = (padded[:, 1:-1, 1:-1] * (1.0 - PHEROMONE_DIFFUSION)
+                 + share * (padded[:, :-2, 1:-1] + padded[:, 2:, 1:-1]
+                            + padded[:, 1:-1, :-2] + padded[:, 1:-1, 2:]))
+        field *= PHEROMONE_EVAPORATION
+        for key, source in sources.items():
+            field[index[key]] += source
+        for key, mask in self.masks.items():
+            i = index.get(key)
+            if i is not None:
+                field[i] *= mask
+        alive = field.reshape(count, -1).max(axis=1) >= PHEROMONE_FLOOR
+        self.chunks = {key: field[i] for i, key in enumerate(keys) if alive[i]}
+
+def pheromone_step(ant):
+    # Climb the scent gradient one tile at a time.  Ants skip the tiles they
+    # just left unless there is nowhere else to go, otherwise one that has
+    # emptied a food tile would circle its fading scent peak.
+    x, y = ant['x'], ant['y']
+    recent = ant.get('recent')
+    if recent is None:
+        recent = ant['recent'] = deque(maxlen=PHEROMONE_MEMORY)
+        ant['route'] = deque(maxlen=TRAIL_LENGTH)
+    options = []
+    fallback = []
+    best, best_scent = None, PHEROMONE_FLOOR
+    for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
+        nx, ny = x + dx, y + dy
+        if not world.in_bounds(nx, ny) or world.get(nx, ny) not in [EMPTY, FOOD]:
+            continue
+        if (nx, ny) in recent:
+            fallback.append((nx, ny))
+            continue
+        options.append((nx, ny))
+        scent = pheromones.get(nx, ny)
+        if scent > best_scent:
+            best, best_scent = (nx, ny), scent
+    options = options or fallback
+    if not options:
+        return None
+    if best is None or rng.random() < PHEROMONE_EXPLORE:
+        best = rng.choice(options)
+    recent.append((x, y))
+    ant['route'].append((x, y))
+    return best
+
+def lay_trail(ant, x, y):
+    # Mark the route the forager came by, strongest at the food and fading
+    # back toward where it started, so ants following on are led to the
+    # spot.  Evaporation wears the trail away like the rest of the field
+    amount = TRAIL_DEPOSIT
+    pheromones.deposit(x, y, amount)
+    route = ant.get('route', ())
+    for px, py in reversed(route):
+        amount *= TRAIL_FADE
+        pheromones.deposit(px, py, amount)
+    if route:
+        route.clear()  # The next trail starts from here
 
 # === Functions ===
 def place_random(symbol, count, avoid):
     positions = []
     while len(positions) < count:
-        x, y = random.randint(0, MAP_WIDTH - 1), random.randint(0, MAP_HEIGHT - 1)
-        if grid[y][x] == EMPTY and (x, y) not in avoid:
-            grid[y][x] = symbol
+        x, y = rng.randint(0, MAP_WIDTH - 1), rng.randint(0, MAP_HEIGHT - 1)
+        if world.get(x, y) == EMPTY and (x, y) not in avoid:
+            world.set(x, y, symbol)
             positions.append((x, y))
     return positions
 
 def spawn_ant(x, y, team_list, ant_type):
     hp = WARRIOR_HP if ant_type == WARRIOR else FORAGER_HP
     team_list.append({'x': x, 'y': y, 'type': ant_type, 'hp': hp, 'tx': x, 'ty': y, 'fx': 0, 'fy': 0})
-    grid[y][x] = ant_type
+    world.set(x, y, ant_type)
 
 def bfs(start, targets):
     if not targets:  # Early exit if no targets
         return None
     if start in targets:  # Already at target
         return start
-    
-    visited = set()
-    queue = deque([(start, [])])
-    
+
+    # Each queue entry carries only the first step of its path, which is all
+    # the caller needs, instead of copying the whole path on every push
+    sx, sy = start
+    visited = {start}
+    queue = deque([(sx, sy, None)])
+
     while queue:
-        (x, y), path = queue.popleft()
-        if (x, y) in visited:
-            continue
-        visited.add((x, y))
-        
+        x, y, first = queue.popleft()
+
         # Check neighbors first before adding to queue
         for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
             nx, ny = x + dx, y + dy
             if (nx, ny) in targets:  # Found target - return immediately
-                return path[0] if path else (nx, ny)
-            
-            if 0 <= nx < MAP_WIDTH and 0 <= ny < MAP_HEIGHT:
-                if grid[ny][nx] in [EMPTY, FOOD] and (nx, ny) not in visited:
-                    queue.append(((nx, ny), path + [(nx, ny)]))
-    
+                profiler.frame['bfs_nodes'] += len(visited)
+                return first or (nx, ny)
+
+            if (nx, ny) not in visited and world.in_bounds(nx, ny) \
+                    and abs(nx - sx) + abs(ny - sy) <= BFS_MAX_RADIUS:
+                if world.get(nx, ny) in [EMPTY, FOOD]:
+                    visited.add((nx, ny))
+                    queue.append((nx, ny, first or (nx, ny)))
+
+    profiler.frame['bfs_nodes'] += len(visited)
     return None
 
-def attack(ant, enemy_team, team_score):
+def attack(ant, enemy_team, team_score, symbol):
     x, y = ant['x'], ant['y']
     for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
         nx, ny = x + dx, y + dy
-        for enemy in enemy_team:
+        for index, enemy in enumerate(enemy_team):
             if enemy['x'] == nx and enemy['y'] == ny:
-                enemy['hp'] -= DAMAGE
-                if enemy['hp'] <= 0:
-                    enemy_team.remove(enemy)
-                    grid[ny][nx] = EMPTY
-                    team_score['kills'] += 1
+                if recorder:
+                    recorder.hit(symbol, index)
+                apply_hit(enemy_team, index, team_score)
                 return
 
-def move_ant(ant, team, enemy_team, team_score, symbol):
-    global ally_food_bank, enemy_food_bank
-    
+def apply_hit(enemy_team, index, team_score):
+    enemy = enemy_team[index]
+    enemy['hp'] -= DAMAGE
+    if enemy['hp'] <= 0:
+        del enemy_team[index]
+        world.set(enemy['x'], enemy['y'], EMPTY)
+        team_score['kills'] += 1
+
+def move_ant(ant, index, enemy_team, team_score, symbol):
     if ant['type'] == WARRIOR:
-        attack(ant, enemy_team, team_score)
-        enemy_positions = {(e['x'], e['y']) for e in enemy_team}
-        if not enemy_positions:  # No enemies to target
+        with profiler.phase('attack'):
+            attack(ant, enemy_team, team_score, symbol)
+        x, y = ant['x'], ant['y']
+        enemy_positions = {(e['x'], e['y']) for e in enemy_team
+                           if abs(e['x'] - x) + abs(e['y'] - y) <= BFS_MAX_RADIUS + 1}
+        if not enemy_positions:  # No enemies within reach
             return
-        target = bfs((ant['x'], ant['y']), enemy_positions)
+        with profiler.phase('bfs'):
+            target = bfs((ant['x'], ant['y']), enemy_positions)
     else:
         if not food_positions:  # No food available
             return
-        target = bfs((ant['x'], ant['y']), set(food_positions))
-    
+        if pheromones:
+            target = pheromone_step(ant)
+        else:
+            with profiler.phase('bfs'):
+                target = bfs((ant['x'], ant['y']), food_positions)
+
     if not target:
         return
-    
+
     nx, ny = target
-    if grid[ny][nx] not in [EMPTY, FOOD]:
+    if world.get(nx, ny) not in [EMPTY, FOOD]:
         return
-    
+
+    if recorder:
+        recorder.move(symbol, index, nx, ny)
+    apply_move(ant, nx, ny, team_score, symbol)
+
+def apply_move(ant, nx, ny, team_score, symbol):
+    global ally_food_bank, enemy_food_bank
+
     # Update grid
     current_pos = (ant['x'], ant['y'])
-    grid[ant['y']][ant['x']] = EMPTY if current_pos not in [ally_colony, enemy_colony] else symbol
-    
-    if grid[ny][nx] == FOOD and ant['type'] == FORAGER:
+    world.set(ant['x'], ant['y'], EMPTY if current_pos not in [ally_colony, enemy_colony] else symbol)
+
+    if world.get(nx, ny) == FOOD and ant['type'] == FORAGER:
         if (nx, ny) in food_positions:
             food_positions.remove((nx, ny))
+            if planner:
+                planner.remove_food(nx, ny)
             team_score['food'] += 1
+            if pheromones:
+                pheromones.set_source(nx, ny, 0.0)
+                lay_trail(ant, nx, ny)
             if symbol == 'C':
                 ally_food_bank += 1
             else:
                 enemy_food_bank += 1
-    
+
     ant['tx'], ant['ty'] = nx, ny
     ant['fx'] = (nx - ant['x']) * TILE_SIZE / MOVE_FRAMES
     ant['fy'] = (ny - ant['y']) * TILE_SIZE / MOVE_FRAMES
@@ -158,39 +572,579 @@ def try_spawn(colony, team_list, food_bank, symbol):
     x, y = colony
     for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
         nx, ny = x + dx, y + dy
-        if 0 <= nx < MAP_WIDTH and 0 <= ny < MAP_HEIGHT and grid[ny][nx] == EMPTY:
-            ant_type = FORAGER if random.random() < 0.6 else WARRIOR
+        if world.in_bounds(nx, ny) and world.get(nx, ny) == EMPTY:
+            ant_type = FORAGER if rng.random() < 0.6 else WARRIOR
+            if recorder:
+                recorder.spawn(symbol, nx, ny, ant_type)
             spawn_ant(nx, ny, team_list, ant_type)
             return food_bank - 1
     return food_bank
 
-def draw_grid():
+def commit_moves():
+    for ant in allies + enemies:
+        ant['x'], ant['y'] = ant['tx'], ant['ty']
+        ant['fx'] = ant['fy'] = 0
+
+def simulate_tick(tick):
+    global ally_food_bank, enemy_food_bank
+    if recorder:
+        recorder.begin_tick(tick)
+    if pheromones:
+        with profiler.phase('pheromones'):
+            pheromones.step()
+    if planner:
+        planned_allies, planned_enemies = list(allies), list(enemies)
+        with profiler.phase('plan'):
+            plans = planner.plan()
+        with profiler.phase('move'):
+            apply_plans(planned_allies, enemies, ally_score, 'C', plans)
+            apply_plans(planned_enemies, allies, enemy_score, 'X', plans)
+    else:
+        with profiler.phase('move'):
+            # A team only loses ants on the other team's turn, so these
+            # indices stay valid while it moves
+            for index, ant in enumerate(list(allies)):
+                move_ant(ant, index, enemies, ally_score, 'C')
+            for index, ant in enumerate(list(enemies)):
+                move_ant(ant, index, allies, enemy_score, 'X')
+    if (tick - 1) % SPAWN_INTERVAL == 0:  # Spawn on the first tick and every SPAWN_INTERVAL after
+        with profiler.phase('spawn'):
+            ally_food_bank = try_spawn(ally_colony, allies, ally_food_bank, 'C')
+            enemy_food_bank = try_spawn(enemy_colony, enemies, enemy_food_bank, 'X')
+    commit_moves()
+    if recorder:
+        recorder.end_tick(tick)
+
+# === Parallel Tick ===
+# Worker processes, started once per game, plan moves and attacks for the ants
+# in horizontal bands of the map.  Everything they read lives in one shared
+# memory block: the tiles, a food bitmap and an ant table the main process
+# refills each tick, so each tick a worker is sent only its bands' rows down
+# its own pipe and sends back only a BFS node count.
+# Plans are written into each ant's slot of the table.  Workers see every ant,
+# so a plan does not depend on how the map was split.  The main process then
+# applies the plans in the usual ally-then-enemy order and re-checks each one
+# against the live state, so clashes at band borders (two ants after one tile,
+# a target killed earlier in the tick) resolve exactly as they would serially.
+ANT_HEADER = 3  # Ant table header: tick generation, ally count, enemy count
+ANT_FIELDS = 7  # Per ant: x, y, type, attack x, attack y, move x, move y (-1 for none)
+
+def ant_table_start(area):
+    return -(-area * 2 // 4) * 4  # After the tiles and food bitmap, int-aligned
+
+def ant_table_size(slots):
+    return (ANT_HEADER + slots * ANT_FIELDS) * 4
+
+class SharedWorld:
+    """Read-only World view over the shared tile mirror, used inside workers."""
+
+    def __init__(self, buffer, width, height):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+
+    def get(self, x, y):
+        code = self.buffer[y * self.width + x]
+        return EMPTY if code == 0 else chr(code)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+class SharedFood:
+    """Set-like view of the shared food bitmap, usable as BFS targets."""
+
+    def __init__(self, buffer, width, height):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+
+    def __contains__(self, position):
+        x, y = position
+        return 0 <= x < self.width and 0 <= y < self.height and self.buffer[y * self.width + x] == 1
+
+    def __bool__(self):
+        return True  # The main process only plans foragers while food remains
+
+def attach_shared_world(name, width, height, radius, slots):
+    global world, shared_tiles, shared_food, shared_ants, ant_cache, BFS_MAX_RADIUS
+    shared_tiles = shared_memory.SharedMemory(name=name)
+    area = width * height
+    world = SharedWorld(shared_tiles.buf[:area], width, height)
+    shared_food = SharedFood(shared_tiles.buf[area:area * 2], width, height)
+    start = ant_table_start(area)
+    shared_ants = shared_tiles.buf[start:start + ant_table_size(slots)].cast('i')
+    ant_cache = None
+    BFS_MAX_RADIUS = radius
+
+def read_ant_table(table):
+    """Return ([(slot, team, x, y, type)], {team: {positions}}) from the shared ant table."""
+    allies_count = table[1]
+    ants = []
+    positions = {ALLY_COLONY: set(), ENEMY_COLONY: set()}
+    for slot in range(allies_count + table[2]):
+        base = ANT_HEADER + slot * ANT_FIELDS
+        symbol = ALLY_COLONY if slot < allies_count else ENEMY_COLONY
+        x, y = table[base], table[base + 1]
+        ants.append((slot, symbol, x, y, chr(table[base + 2])))
+        positions[symbol].add((x, y))
+    return ants, positions
+
+def plan_region(task):
+    # The worker's own profiler is never shown, so the BFS nodes it counts
+    # go back for the main process to add up
+    global ant_cache
+    top, bottom, plan_food = task
+    table = shared_ants
+    if ant_cache is None or ant_cache[0] != table[0]:  # First band of a new tick
+        ant_cache = (table[0], read_ant_table(table))
+    ants, positions = ant_cache[1]
+    nodes_before = profiler.frame['bfs_nodes']
+    for slot, symbol, x, y, ant_type in ants:
+        if not top <= y < bottom:
+            continue
+        attack_at = move_to = None
+        if ant_type == WARRIOR:
+            enemy_positions = positions[ENEMY_COLONY if symbol == ALLY_COLONY else ALLY_COLONY]
+            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
+                if (x + dx, y + dy) in enemy_positions:
+                    attack_at = (x + dx, y + dy)
+                    break
+            nearby = {(ex, ey) for ex, ey in enemy_positions if abs(ex - x) + abs(ey - y) <= BFS_MAX_RADIUS + 1}
+            move_to = bfs((x, y), nearby)
+        elif plan_food:
+            move_to = bfs((x, y), shared_food)
+        base = ANT_HEADER + slot * ANT_FIELDS + 3
+        table[base], table[base + 1] = attack_at or (-1, -1)
+        table[base + 2], table[base + 3] = move_to or (-1, -1)
+    return profiler.frame['bfs_nodes'] - nodes_before
+
+def planner_worker(conn, name, width, height, radius, slots):
+    attach_shared_world(name, width, height, radius, slots)
+    while True:
+        bands = conn.recv()
+        if bands is None:
+            return
+        try:
+            conn.send(sum(plan_region(band) for band in bands))
+        except Exception as e:
+            conn.send(e)  # Raised again in the main process
+
+class ParallelPlanner:
+    def __init__(self, workers):
+        area = MAP_WIDTH * MAP_HEIGHT
+        self.slots = 2 * max(MAX_ANTS, 1)  # try_spawn keeps each team at MAX_ANTS
+        start = ant_table_start(area)
+        size = start + ant_table_size(self.slots)
+        self.tiles = shared_memory.SharedMemory(create=True, size=size)
+        self.tiles.buf[:size] = bytes(size)
+        world.attach_mirror(self.tiles.buf[:area])
+        self.food = self.tiles.buf[area:area * 2]
+        for x, y in food_positions:
+            self.food[y * MAP_WIDTH + x] = 1
+        self.ants = self.tiles.buf[start:size].cast('i')
+        self.workers = []
+        for _ in range(workers):
+            conn, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=planner_worker, daemon=True,
+                                              args=(child, self.tiles.name, MAP_WIDTH, MAP_HEIGHT,
+                                                    BFS_MAX_RADIUS, self.slots))
+            process.start()
+            child.close()
+            self.workers.append((process, conn))
+        # Bands follow the map height, so even the default 17-row map gives
+        # every worker something to plan
+        self.band = max(REGION_MIN_ROWS, -(-MAP_HEIGHT // (workers * BANDS_PER_WORKER)))
+
+    def plan(self):
+        """Return {(team, index): (attack_at, move_to)} for every ant alive now."""
+        table, band = self.ants, self.band
+        teams = ((ALLY_COLONY, allies), (ENEMY_COLONY, enemies))
+        busy = set()  # Bands with ants in them
+        slot = 0
+        for symbol, team in teams:
+            for ant in team:
+                base = ANT_HEADER + slot * ANT_FIELDS
+                table[base], table[base + 1], table[base + 2] = ant['x'], ant['y'], ord(ant['type'])
+                busy.add(ant['y'] // band)
+                slot += 1
+        table[1], table[2] = len(allies), len(enemies)
+        table[0] = (table[0] + 1) & 0x7fffffff  # Tells workers the table changed
+
+        plan_food = bool(food_positions) and not pheromones
+        tasks = [(b * band, (b + 1) * band, plan_food) for b in sorted(busy)]
+        count = len(self.workers)
+        for i, (process, conn) in enumerate(self.workers):
+            conn.send(tasks[i::count])
+        for process, conn in self.workers:
+            nodes = conn.recv()
+            if isinstance(nodes, Exception):
+                raise nodes
+            profiler.frame['bfs_nodes'] += nodes
+
+        plans = {}
+        slot = 0
+        for symbol, team in teams:
+            for index in range(len(team)):
+                base = ANT_HEADER + slot * ANT_FIELDS + 3
+                ax, ay, mx, my = table[base:base + 4].tolist()
+                plans[(symbol, index)] = (None if ax < 0 else (ax, ay), None if mx < 0 else (mx, my))
+                slot += 1
+        return plans
+
+    def remove_food(self, x, y):
+        self.food[y * MAP_WIDTH + x] = 0
+
+    def close(self):
+        for process, conn in self.workers:
+            conn.send(None)
+        for process, conn in self.workers:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        world.mirror = None
+        self.food.release()
+        self.ants.release()
+        self.tiles.close()
+        self.tiles.unlink()
+
+def apply_plans(planned, enemy_team, team_score, symbol, plans):
+    killed = 0  # Planned ants already removed from team, ahead of this one
+    for index, ant in enumerate(planned):
+        if ant['hp'] <= 0:  # Killed earlier this tick
+            killed += 1
+            continue
+        attack_at, target = plans[(symbol, index)]
+        if attack_at:
+            for enemy_index, enemy in enumerate(enemy_team):
+                if (enemy['x'], enemy['y']) == attack_at:
+                    if recorder:
+                        recorder.hit(symbol, enemy_index)
+                    apply_hit(enemy_team, enemy_index, team_score)
+                    break
+        if ant['type'] == FORAGER and pheromones and food_positions:
+            target = pheromone_step(ant)
+        if not target:
+            continue
+        nx, ny = target
+        if world.get(nx, ny) not in [EMPTY, FOOD]:
+            continue
+        if recorder:
+            recorder.move(symbol, index - killed, nx, ny)
+        apply_move(ant, nx, ny, team_score, symbol)
+
+# === Replay ===
+# A recording is a header followed by tagged records.  Keyframes hold the full
+# game state (zlib-compressed JSON); every other record is a few packed bytes,
+# so a long game costs a handful of bytes per ant move.
+REPLAY_MAGIC = b'ANTR'
+REPLAY_VERSION = 2
+REPLAY_HEADER = struct.Struct('<4sBHHq')  # magic, version, width, height, seed
+REC_TICK = struct.Struct('<I')            # tick number
+REC_MOVE = struct.Struct('<BHHH')         # team, ant index, x, y
+REC_HIT = struct.Struct('<BH')            # attacking team, target index
+REC_SPAWN = struct.Struct('<BHHc')        # team, x, y, ant type
+REC_KEYFRAME = struct.Struct('<II')       # tick number, payload length
+TEAM_IDS = {ALLY_COLONY: 0, ENEMY_COLONY: 1}
+TEAM_SYMBOLS = (ALLY_COLONY, ENEMY_COLONY)
+# Ant keys only the live forager AI uses.  Replays apply recorded moves and
+# never update them, so keyframes leave them out; otherwise a seek would land
+# on a state that playing straight through never reaches
+ANT_AI_KEYS = ('recent', 'route')
+
+def replay_ant(ant):
+    return {key: value for key, value in ant.items() if key not in ANT_AI_KEYS}
+
+def snapshot_state():
+    return {
+        'chunks': {f"{cx},{cy}": ''.join(chunk) for (cx, cy), chunk in world.chunks.items()},
+        'food': sorted(food_positions),
+        'obstacles': sorted(obstacles),
+        'colonies': [ally_colony, enemy_colony],
+        'allies': [replay_ant(ant) for ant in allies],
+        'enemies': [replay_ant(ant) for ant in enemies],
+        'scores': [ally_score, enemy_score],
+        'banks': [ally_food_bank, enemy_food_bank],
+    }
+
+def restore_state(state):
+    global world, food_positions, obstacles, allies, enemies, ally_colony, enemy_colony
+    global ally_score, enemy_score, ally_food_bank, enemy_food_bank
+    world = World(MAP_WIDTH, MAP_HEIGHT)
+    for key, tiles in state['chunks'].items():
+        cx, cy = map(int, key.split(','))
+        world.chunks[(cx, cy)] = list(tiles)
+    food_positions = {tuple(p) for p in state['food']}
+    obstacles = {tuple(p) for p in state['obstacles']}
+    ally_colony, enemy_colony = (tuple(p) for p in state['colonies'])
+    allies = [replay_ant(ant) for ant in state['allies']]  # Older recordings still carry AI keys
+    enemies = [replay_ant(ant) for ant in state['enemies']]
+    ally_score, enemy_score = (dict(score) for score in state['scores'])
+    ally_food_bank, enemy_food_bank = state['banks']
+
+class ReplayRecorder:
+    def __init__(self, path, seed):
+        self.file = open(path, 'wb')
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, MAP_WIDTH, MAP_HEIGHT, seed))
+        self.keyframe(0)
+
+    def keyframe(self, tick):
+        payload = zlib.compress(json.dumps(snapshot_state(), separators=(',', ':')).encode())
+        self.file.write(b'K' + REC_KEYFRAME.pack(tick, len(payload)) + payload)
+
+    def begin_tick(self, tick):
+        self.file.write(b'T' + REC_TICK.pack(tick))
+
+    def end_tick(self, tick):
+        if tick % KEYFRAME_INTERVAL == 0:
+            self.keyframe(tick)
+
+    def move(self, symbol, index, x, y):
+        self.file.write(b'M' + REC_MOVE.pack(TEAM_IDS[symbol], index, x, y))
+
+    def hit(self, symbol, index):
+        self.file.write(b'H' + REC_HIT.pack(TEAM_IDS[symbol], index))
+
+    def spawn(self, symbol, x, y, ant_type):
+        self.file.write(b'S' + REC_SPAWN.pack(TEAM_IDS[symbol], x, y, ant_type.encode()))
+
+    def close(self):
+        self.file.close()
+
+class ReplayPlayer:
+    def __init__(self, path):
+        global MAP_WIDTH, MAP_HEIGHT
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, MAP_WIDTH, MAP_HEIGHT, self.seed = REPLAY_HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not an ants.py replay")
+        self.ticks = [[]]  # Events per tick; index 0 is the initial state
+        self.keyframes = {}
+        self.tick = 0
+        self._parse(data, REPLAY_HEADER.size)
+
+    def _parse(self, data, pos):
+        view = memoryview(data)
+        while pos < len(data):
+            tag = data[pos:pos + 1]
+            pos += 1
+            if tag == b'K':
+                tick, length = REC_KEYFRAME.unpack_from(data, pos)
+                pos += REC_KEYFRAME.size
+                self.keyframes[tick] = view[pos:pos + length]
+                pos += length
+            elif tag == b'T':
+                tick, = REC_TICK.unpack_from(data, pos)
+                pos += REC_TICK.size
+                self.ticks.append([])
+            elif tag == b'M':
+                self.ticks[-1].append(('M',) + REC_MOVE.unpack_from(data, pos))
+                pos += REC_MOVE.size
+            elif tag == b'H':
+                self.ticks[-1].append(('H',) + REC_HIT.unpack_from(data, pos))
+                pos += REC_HIT.size
+            elif tag == b'S':
+                self.ticks[-1].append(('S',) + REC_SPAWN.unpack_from(data, pos))
+                pos += REC_SPAWN.size
+            else:
+                raise ValueError(f"Corrupt replay record {tag!r} at byte {pos - 1}")
+
+    @property
+    def last_tick(self):
+        return len(self.ticks) - 1
+
+    def seek(self, tick):
+        tick = max(0, min(tick, self.last_tick))
+        start = max(k for k in self.keyframes if k <= tick)
+        restore_state(json.loads(zlib.decompress(self.keyframes[start])))
+        for t in range(start + 1, tick + 1):
+            self._apply(self.ticks[t])
+        self.tick = tick
+
+    def step(self):
+        if self.tick < self.last_tick:
+            self.tick += 1
+            self._apply(self.ticks[self.tick])
+
+    def _apply(self, events):
+        global ally_food_bank, enemy_food_bank
+        for event in events:
+            symbol = TEAM_SYMBOLS[event[1]]
+            team, enemy_team, team_score = ((allies, enemies, ally_score) if symbol == ALLY_COLONY
+                                            else (enemies, allies, enemy_score))
+            if event[0] == 'M':
+                apply_move(team[event[2]], event[3], event[4], team_score, symbol)
+            elif event[0] == 'H':
+                apply_hit(enemy_team, event[2], team_score)
+            else:
+                spawn_ant(event[2], event[3], team, event[4].decode())
+                if symbol == ALLY_COLONY:
+                    ally_food_bank -= 1
+                else:
+                    enemy_food_bank -= 1
+        commit_moves()
+
+def verify_replay(path):
+    """Check that seeking to every tick gives the state reached by playing straight through."""
+    player = ReplayPlayer(path)
+    player.seek(0)
+    straight = [json.dumps(snapshot_state(), sort_keys=True)]
+    while player.tick < player.last_tick:
+        player.step()
+        straight.append(json.dumps(snapshot_state(), sort_keys=True))
+    mismatches = []
+    for tick, expected in enumerate(straight):
+        player.seek(tick)
+        if json.dumps(snapshot_state(), sort_keys=True) != expected:
+            mismatches.append(tick)
+    if mismatches:
+        print(f"{path}: seeking differs from straight playback at {len(mismatches)} of "
+              f"{len(straight)} ticks, first at tick {mismatches[0]}")
+        return False
+    print(f"{path}: all {len(straight)} ticks match when seeking")
+    return True
+
+def draw_frame(caption=None):
+    screen.set_clip(None)
     screen.fill((180, 180, 180))
-    for y in range(MAP_HEIGHT):
-        for x in range(MAP_WIDTH):
-            rect = pygame.Rect(x * TILE_SIZE, (y + 1) * TILE_SIZE + 12, TILE_SIZE, TILE_SIZE)
-            symbol = grid[y][x]
-            color = COLORS.get(symbol, (0, 0, 0))
-            pygame.draw.rect(screen, color, rect)
-            pygame.draw.rect(screen, (100, 100, 100), rect, 1)
-            if (x, y) in food_positions:
-                center = rect.center
-                pygame.draw.circle(screen, COLORS[FOOD], center, 8)
+    screen.set_clip(pygame.Rect(0, MAP_TOP, camera.view_width, camera.view_height))
+    with profiler.phase('draw_grid'):
+        draw_grid()
+    with profiler.phase('draw_ants'):
+        draw_ants(allies, COLORS[FORAGER])
+        draw_ants(enemies, COLORS[WARRIOR])
+    screen.set_clip(None)
+    draw_labels(not food_positions, caption)
+
+def draw_hud():
+    lines = profiler.hud_lines()
+    panel = pygame.Surface((300, 20 * len(lines) + 10), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    for i, line in enumerate(lines):
+        panel.blit(hud_font.render(line, True, (255, 255, 255)), (8, 5 + 20 * i))
+    screen.blit(panel, (camera.view_width - panel.get_width() - 10, MAP_TOP + 10))
+
+def play_replay(path, start_tick=0):
+    player = ReplayPlayer(path)
+    init_display()
+    player.seek(start_tick)
+    camera.center_on(*ally_colony)
+    paused = False
+    frame = 0
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            camera.handle_event(event)
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    player.seek(player.tick + 1)
+                elif event.key == pygame.K_LEFT:
+                    player.seek(player.tick - 1)
+                elif event.key == pygame.K_PAGEUP:
+                    player.seek(player.tick + KEYFRAME_INTERVAL)
+                elif event.key == pygame.K_PAGEDOWN:
+                    player.seek(player.tick - KEYFRAME_INTERVAL)
+                elif event.key == pygame.K_HOME:
+                    player.seek(0)
+        camera.handle_keys()
+        if not paused and frame % MOVE_FRAMES == 0:
+            player.step()
+        frame += 1
+        draw_frame(f"Replay tick {player.tick}/{player.last_tick} (Space, Left/Right, PgUp/PgDn, Home)")
+        pygame.display.flip()
+        clock.tick(FPS)
+    safe_exit()
+
+def render_replay(path, out, start_tick=0, end_tick=None):
+    """Render a replay without a window, one image per tick.
+
+    `out` ending in a video extension is encoded with ffmpeg; anything else is
+    treated as a directory that receives numbered PNG files.
+    """
+    player = ReplayPlayer(path)
+    init_display(headless=True)
+    end_tick = player.last_tick if end_tick is None else min(end_tick, player.last_tick)
+    player.seek(start_tick)
+    camera.center_on(*ally_colony)
+    encoder = None
+    if out.lower().endswith(('.mp4', '.mkv', '.webm', '.avi', '.gif')):
+        width, height = screen.get_size()
+        encoder = subprocess.Popen(
+            ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{width}x{height}', '-r', str(FPS), '-i', '-', out],
+            stdin=subprocess.PIPE)
+    else:
+        os.makedirs(out, exist_ok=True)
+    try:
+        while True:
+            draw_frame(f"Replay tick {player.tick}/{player.last_tick}")
+            if encoder:
+                encoder.stdin.write(pygame.image.tobytes(screen, 'RGB'))
+            else:
+                pygame.image.save(screen, os.path.join(out, f"tick_{player.tick:06d}.png"))
+            if player.tick >= end_tick:
+                break
+            player.step()
+    finally:
+        if encoder:
+            encoder.stdin.close()
+            encoder.wait()
+        pygame.quit()
+
+# === Drawing ===
+def draw_grid():
+    x0, y0, x1, y1 = camera.visible_tiles()
+    left, top = camera.to_screen(x0, y0)
+    right, bottom = camera.to_screen(x1 + 1, y1 + 1)
+    pygame.draw.rect(screen, COLORS[EMPTY], (left, top, right - left, bottom - top))
+
+    # Only allocated chunks can hold anything but EMPTY, so the rest of the
+    # view is covered by the fill above
+    size = int(camera.tile) + 1
+    radius = max(1, int(8 * camera.zoom))
+    for ox, oy, chunk in world.chunks_in(x0, y0, x1, y1):
+        for y in range(max(y0, oy), min(y1, oy + CHUNK_SIZE - 1) + 1):
+            row = (y - oy) * CHUNK_SIZE - ox
+            for x in range(max(x0, ox), min(x1, ox + CHUNK_SIZE - 1) + 1):
+                symbol = chunk[row + x]
+                if symbol == EMPTY:
+                    continue
+                sx, sy = camera.to_screen(x, y)
+                rect = pygame.Rect(int(sx), int(sy), size, size)
+                pygame.draw.rect(screen, COLORS.get(symbol, (0, 0, 0)), rect)
+                if (x, y) in food_positions:
+                    pygame.draw.circle(screen, COLORS[FOOD], rect.center, radius)
+
+    if camera.tile >= 8:  # Grid lines turn into noise when zoomed far out
+        for x in range(x0, x1 + 2):
+            sx = camera.to_screen(x, y0)[0]
+            pygame.draw.line(screen, (100, 100, 100), (sx, top), (sx, bottom))
+        for y in range(y0, y1 + 2):
+            sy = camera.to_screen(x0, y)[1]
+            pygame.draw.line(screen, (100, 100, 100), (left, sy), (right, sy))
 
 def draw_ants(team, color):
+    x0, y0, x1, y1 = camera.visible_tiles()
+    zoom = camera.zoom
     for ant in team:
-        base_x = ant['x'] * TILE_SIZE
-        base_y = (ant['y'] + 1) * TILE_SIZE + 12
+        if not (x0 <= ant['x'] <= x1 and y0 <= ant['y'] <= y1):
+            continue
+        base_x, base_y = camera.to_screen(ant['x'], ant['y'])
         if ant['fx'] != 0 or ant['fy'] != 0:
-            base_x += ant['fx']
-            base_y += ant['fy']
-        rect = pygame.Rect(base_x + 12, base_y + 12, 24, 24)
+            base_x += ant['fx'] * zoom
+            base_y += ant['fy'] * zoom
+        rect = pygame.Rect(base_x + 12 * zoom, base_y + 12 * zoom, max(1, 24 * zoom), max(1, 24 * zoom))
         pygame.draw.ellipse(screen, color, rect)
-        if ant['type'] == WARRIOR:
+        if ant['type'] == WARRIOR and zoom >= 0.25:
             hp_ratio = ant['hp'] / WARRIOR_HP
-            pygame.draw.rect(screen, (255, 0, 0), (base_x + 10, base_y + 6, int(28 * hp_ratio), 4))
+            pygame.draw.rect(screen, (255, 0, 0), (base_x + 10 * zoom, base_y + 6 * zoom, int(28 * zoom * hp_ratio), max(1, 4 * zoom)))
 
-def draw_labels(game_over):
+def draw_labels(game_over, caption=None):
     text1 = font.render(f"Allies - Food: {ally_score['food']} | Kills: {ally_score['kills']} | Bank: {ally_food_bank}", True, (0, 0, 0))
     text2 = font.render(f"Enemies - Food: {enemy_score['food']} | Kills: {enemy_score['kills']} | Bank: {enemy_food_bank}", True, (0, 0, 0))
     legend1 = font.render("Legend:", True, (0, 0, 0))
@@ -199,46 +1153,177 @@ def draw_labels(game_over):
     screen.blit(text2, (10, 30))
     screen.blit(legend1, (400, 5))
     screen.blit(legend2, (400, 30))
+    if caption:
+        caption_text = font.render(caption, True, (0, 0, 0))
+        screen.blit(caption_text, (10, MAP_TOP + camera.view_height + 23))
     if game_over:
         over_text = font.render("Game Over - Close Window to Exit", True, (0, 0, 0))
-        screen.blit(over_text, (10, (MAP_HEIGHT + 1) * TILE_SIZE + 10))
+        screen.blit(over_text, (10, MAP_TOP + camera.view_height - 2))
 
 def safe_exit():
     pygame.quit()
     sys.exit()
 
 # === Main Simulation ===
-initialize_game()
-turn = 1
-running = True
-game_over = False
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    if not game_over:
-        if turn % MOVE_FRAMES == 1:
-            for ant in list(allies):
-                move_ant(ant, allies, enemies, ally_score, 'C')
-            for ant in list(enemies):
-                move_ant(ant, enemies, allies, enemy_score, 'X')
-            if turn // MOVE_FRAMES % SPAWN_INTERVAL == 0:
-                ally_food_bank = try_spawn(ally_colony, allies, ally_food_bank, 'C')
-                enemy_food_bank = try_spawn(enemy_colony, enemies, enemy_food_bank, 'X')
-            for ant in allies + enemies:
-                ant['x'], ant['y'] = ant['tx'], ant['ty']
-                ant['fx'] = ant['fy'] = 0
-        if not food_positions:
-            game_over = True
-        turn += 1
-
-    draw_grid()
-    draw_ants(allies, COLORS[FORAGER])
-    draw_ants(enemies, COLORS[WARRIOR])
-    draw_labels(game_over)
-    pygame.display.flip()
-    clock.tick(FPS)
-
-safe_exit()
+def run_game(seed, record_path=None, show_hud=False, profile_path=None):
+    global recorder, planner
+    rng.seed(seed)
+    init_display()
+    initialize_game()
+    if WORKERS:
+        planner = ParallelPlanner(WORKERS)
+    camera.center_on(*ally_colony)
+    if record_path:
+        recorder = ReplayRecorder(record_path, seed)
+    turn = 1
+    tick = 0
+    frame = 0
+    running = True
+    game_over = False
+
+    while running:
+        frame += 1
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_hud = not show_hud
+            camera.handle_event(event)
+        camera.handle_keys()
+
+        simulated = False
+        if not game_over:
+            if turn % MOVE_FRAMES == 1:
+                tick += 1
+                simulate_tick(tick)
+                simulated = True
+            if not food_positions:
+                game_over = True
+            turn += 1
+
+        draw_frame()
+        if show_hud:
+            draw_hud()
+        with profiler.phase('flip'):
+            pygame.display.flip()
+        profiler.end_frame(frame, tick, simulated)
+        clock.tick(FPS)
+
+    if profile_path:
+        profiler.export(profile_path)
+    if recorder:
+        recorder.close()
+    if planner:
+        planner.close()
+    safe_exit()
+
+def configure(args):
+    global MAP_WIDTH, MAP_HEIGHT, NUM_FOOD, NUM_OBSTACLES, MAX_ANTS, FORAGER_AI, WORKERS
+    if args.size:
+        MAP_WIDTH, MAP_HEIGHT = args.size
+    NUM_FOOD, NUM_OBSTACLES, MAX_ANTS, FORAGER_AI = args.food, args.obstacles, args.max_ants, args.ai
+    WORKERS = args.workers
+
+def benchmark(ticks, seed):
+    """Run each forager AI headlessly for the same game and print its cost.
+
+    With WORKERS set, every AI is also timed with the parallel tick on 1, 2,
+    4, ... up to WORKERS processes, to show how it scales with the cores there are.
+    """
+    global FORAGER_AI, planner
+    chosen = FORAGER_AI
+    counts = {0, WORKERS} | {n for n in (1, 2, 4, 8, 16, 32) if n < WORKERS}
+    if WORKERS:
+        print(f"{os.cpu_count()} CPUs")
+    for ai in (['bfs', 'pheromone'] if np is not None else ['bfs']):
+        for workers in sorted(counts):
+            FORAGER_AI = ai
+            rng.seed(seed)
+            initialize_game()
+            planner = ParallelPlanner(workers) if workers else None
+            ant_turns = 0
+            start = time.perf_counter()
+            for tick in range(1, ticks + 1):
+                ant_turns += len(allies) + len(enemies)
+                simulate_tick(tick)
+            elapsed = time.perf_counter() - start
+            if planner:
+                planner.close()
+                planner = None
+            food = ally_score['food'] + enemy_score['food']
+            print(f"{ai:>9} x{workers:<2}: {ticks / elapsed:8.1f} ticks/s"
+                  f"  {elapsed / max(ant_turns, 1) * 1e6:8.1f} us/ant-turn"
+                  f"  {len(allies) + len(enemies):5d} ants  {food:6d} food collected")
+    FORAGER_AI = chosen
+
+def seed_arg(text):
+    """A --seed value; recordings store it as a signed 64-bit number."""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"seed must be an integer, not {text!r}")
+    if not -2 ** 63 <= seed < 2 ** 63:
+        raise argparse.ArgumentTypeError(f"seed must be between {-2 ** 63} and {2 ** 63 - 1}")
+    return seed
+
+def size_arg(text):
+    """A --size value; recordings store map sizes and positions as 16-bit numbers."""
+    try:
+        width, height = (int(n) for n in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 24x17, not {text!r}")
+    if not (0 < width <= 0xffff and 0 < height <= 0xffff):
+        raise argparse.ArgumentTypeError(f"width and height must be between 1 and {0xffff}")
+    return width, height
+
+def max_ants_arg(text):
+    """A --max-ants value; recordings store ant indices as 16-bit numbers."""
+    try:
+        count = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"max ants must be an integer, not {text!r}")
+    if not 0 <= count <= 0xffff:
+        raise argparse.ArgumentTypeError(f"max ants must be between 0 and {0xffff}")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Ant Bot Simulation")
+    parser.add_argument('--seed', type=seed_arg, default=SEED, help="seed for a reproducible game")
+    parser.add_argument('--record', metavar='FILE', help="save the game to a replay file")
+    parser.add_argument('--replay', metavar='FILE', help="play back a replay file")
+    parser.add_argument('--seek', type=int, default=0, metavar='TICK', help="start the replay at this tick")
+    parser.add_argument('--verify', action='store_true',
+                        help="check that seeking in the replay matches playing it straight through")
+    parser.add_argument('--render', metavar='OUT',
+                        help="render the replay headlessly to a video file or a PNG directory")
+    parser.add_argument('--size', type=size_arg, metavar='WxH', help=f"map size in tiles (default {MAP_WIDTH}x{MAP_HEIGHT})")
+    parser.add_argument('--food', type=int, default=NUM_FOOD, help="food placed at the start")
+    parser.add_argument('--obstacles', type=int, default=NUM_OBSTACLES, help="obstacles placed at the start")
+    parser.add_argument('--max-ants', type=max_ants_arg, default=MAX_ANTS, help="colony size limit per team")
+    parser.add_argument('--ai', choices=['bfs', 'pheromone'], default=FORAGER_AI, help="forager behaviour")
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help="plan each tick on this many processes (0 = serial)")
+    parser.add_argument('--hud', action='store_true', help="start with the performance HUD shown (toggle with F3)")
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help="write per-frame phase timings to a .csv or .json file on exit")
+    parser.add_argument('--benchmark', type=int, metavar='TICKS',
+                        help="time both forager AIs for this many ticks without a window and exit")
+    args = parser.parse_args()
+    if args.ai == 'pheromone' and np is None:
+        parser.error("the pheromone forager AI needs numpy")
+    configure(args)
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.seed if args.seed is not None else 0)
+    elif args.replay and args.verify:
+        sys.exit(0 if verify_replay(args.replay) else 1)
+    elif args.replay and args.render:
+        render_replay(args.replay, args.render, args.seek)
+    elif args.replay:
+        play_replay(args.replay, args.seek)
+    else:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 63)
+        run_game(seed, args.record, args.hud, args.profile_out)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 import time
+from sensors import Sensors
+
+sensors = Sensors()
 
 def get_cpu_temperature():
     """Reads the CPU temperature from the system."""
-    try:
-        with open("/sys/class/thermal/thermal_zone0/temp", "r") as file:
-            temp = int(file.read()) / 1000  # Convert from millidegrees to degrees Celsius
-        return temp
-    except FileNotFoundError:
+    temp = sensors.temperature()
+    if temp is None:
         print("Could not read temperature. Are you running this on a Raspberry Pi?")
-        return None
+    return temp
 
 def monitor_temperature(interval=5):
     """Monitors and prints the CPU temperature at a regular interval."""
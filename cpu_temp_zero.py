@@ -1,39 +1,28 @@
-import os
-<<<<<<< HEAD
+import time
+from sensors import Sensors  # sysfs, then mailbox, then vcgencmd
+
+sensors = Sensors()
 
 def get_cpu_temp():
     """Fetch CPU temperature from Raspberry Pi system."""
-    try:
-        # Get temperature from vcgencmd
-        temp_output = os.popen("vcgencmd measure_temp").readline()
-        temp_c = float(temp_output.replace("temp=", "").replace("'C\n", ""))
-        
-        # Convert to Fahrenheit
-        temp_f = (temp_c * 9/5) + 32
-        
-        return temp_c, temp_f
-    except Exception as e:
-        print("Error reading temperature:", e)
+    temp_c = sensors.temperature()
+    if temp_c is None:
+        print("Error reading temperature")
         return None, None
 
-if __name__ == "__main__":
-    temp_c, temp_f = get_cpu_temp()
-    if temp_c is not None:
-        print(f"CPU Temperature: {temp_c:.2f}°C / {temp_f:.2f}°F")
-    else:
-        print("Could not read CPU temperature.")
-import os
+    # Convert to Fahrenheit
+    temp_f = (temp_c * 9/5) + 32
 
-temp = os.popen("vcgencmd measure_temp").readline()
-print("CPU Temperature:", temp)
-=======
-import time
+    return temp_c, temp_f
 
-def get_cpu_temp():
-    temp = os.popen("vcgencmd measure_temp").readline()
-    return float(temp.replace("temp=", "").replace("'C\n", ""))
-
-while True:
-    print("CPU Temp:", get_cpu_temp(), "°C")
-    time.sleep(5)  # Check every 5 seconds
->>>>>>>
+if __name__ == "__main__":
+    try:
+        while True:
+            temp_c, temp_f = get_cpu_temp()
+            if temp_c is not None:
+                print(f"CPU Temperature: {temp_c:.2f}°C / {temp_f:.2f}°F")
+            else:
+                print("Could not read CPU temperature.")
+            time.sleep(5)  # Check every 5 seconds
+    except KeyboardInterrupt:
+        sensors.close()
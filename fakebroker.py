@@ -0,0 +1,199 @@
+# A small MQTT 3.1.1 broker for trying the senders and receivers without
+# mosquitto: it accepts any client, acknowledges QoS 1 and 2, passes messages
+# on to matching subscriptions (at QoS 0) and keeps a list of everything
+# published. stop() and start() drop and bring back the link, to see how
+# clients cope with a broker going away.
+#
+#   broker = FakeBroker()      # Any free port; see broker.port
+#   broker.start()
+#   ...
+#   broker.messages            # [(topic, payload, qos), ...]
+#   broker.stop()
+#
+# python3 fakebroker.py [port]  serves on the LAN and prints each message
+import socket
+import struct
+import sys
+import threading
+
+from paho.mqtt.client import topic_matches_sub
+
+# Packet types
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = range(1, 8)
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK, PINGREQ, PINGRESP, DISCONNECT = range(8, 15)
+
+
+def _read_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("Client went away")
+        data += chunk
+    return bytes(data)
+
+
+# One packet as (type, flags, body)
+def _read_packet(sock):
+    first = _read_exact(sock, 1)[0]
+    length, shift = 0, 0
+    while True:
+        byte = _read_exact(sock, 1)[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    return first >> 4, first & 0x0F, _read_exact(sock, length)
+
+
+def _packet(kind, body=b'', flags=0):
+    header = bytearray([kind << 4 | flags])
+    length = len(body)
+    while True:
+        byte, length = length & 0x7F, length >> 7
+        header.append(byte | (0x80 if length else 0))
+        if not length:
+            break
+    return bytes(header) + body
+
+
+def _string(data, pos):
+    n = struct.unpack_from('>H', data, pos)[0]
+    return data[pos + 2:pos + 2 + n].decode(), pos + 2 + n
+
+
+class FakeBroker:
+    # port 0 picks a free port, kept across stop() and start()
+    def __init__(self, host='127.0.0.1', port=0, verbose=False):
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self.messages = []
+        self.connects = 0
+        self._server = None
+        self._clients = {}  # Socket: list of subscription filters
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen()
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, args=(self._server,), daemon=True).start()
+
+    # Close the listening socket and every connection, as if the broker died
+    def stop(self):
+        if self._server is not None:
+            # shutdown() wakes the thread in accept(); close() alone does not
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+        with self._lock:
+            clients = list(self._clients)
+            self._clients.clear()
+        for sock in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def _accept(self, server):
+        while True:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                return  # stop() closed it
+            with self._lock:
+                self._clients[sock] = []
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _send(self, sock, data):
+        try:
+            sock.sendall(data)
+        except OSError:
+            pass
+
+    def _serve(self, sock):
+        try:
+            while True:
+                kind, flags, body = _read_packet(sock)
+                if kind == CONNECT:
+                    self.connects += 1
+                    self._send(sock, _packet(CONNACK, b'\x00\x00'))
+                elif kind == PUBLISH:
+                    self._publish(sock, flags, body)
+                elif kind == PUBREL:
+                    self._send(sock, _packet(PUBCOMP, body[:2]))
+                elif kind == SUBSCRIBE:
+                    self._subscribe(sock, body)
+                elif kind == UNSUBSCRIBE:
+                    self._unsubscribe(sock, body)
+                elif kind == PINGREQ:
+                    self._send(sock, _packet(PINGRESP))
+                elif kind == DISCONNECT:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._clients.pop(sock, None)
+            sock.close()
+
+    def _publish(self, sock, flags, body):
+        qos = (flags >> 1) & 3
+        topic, pos = _string(body, 0)
+        if qos:
+            packet_id = body[pos:pos + 2]
+            pos += 2
+        payload = body[pos:]
+        with self._lock:
+            self.messages.append((topic, payload, qos))
+            targets = [s for s, filters in self._clients.items()
+                       if any(topic_matches_sub(f, topic) for f in filters)]
+        if self.verbose:
+            print(f"{topic}: {payload!r}")
+        if qos == 1:
+            self._send(sock, _packet(PUBACK, packet_id))
+        elif qos == 2:
+            self._send(sock, _packet(PUBREC, packet_id))
+        out = _packet(PUBLISH, body[:2 + len(topic.encode())] + payload)
+        for target in targets:
+            self._send(target, out)
+
+    def _subscribe(self, sock, body):
+        pos = 2
+        granted = bytearray()
+        filters = []
+        while pos < len(body):
+            topic, pos = _string(body, pos)
+            filters.append(topic)
+            granted.append(0)  # Delivered at QoS 0
+            pos += 1
+        with self._lock:
+            self._clients.get(sock, []).extend(filters)
+        self._send(sock, _packet(SUBACK, body[:2] + granted))
+
+    def _unsubscribe(self, sock, body):
+        pos = 2
+        with self._lock:
+            filters = self._clients.get(sock, [])
+            while pos < len(body):
+                topic, pos = _string(body, pos)
+                if topic in filters:
+                    filters.remove(topic)
+        self._send(sock, _packet(UNSUBACK, body[:2]))
+
+
+if __name__ == "__main__":
+    broker = FakeBroker('0.0.0.0', int(sys.argv[1]) if len(sys.argv) > 1 else 1883, verbose=True)
+    broker.start()
+    print(f"Fake broker listening on port {broker.port}, Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        broker.stop()
@@ -6,10 +6,13 @@ sys.path.append('./lcdlib')
 
 import LCD1602
 import time
+from timeline import Timeline
+from glyphs import GlyphManager
 
 # Initialize LCD and backlight
-lcd = LCD1602.LCD1602(16, 2)
-led = LCD1602.SN3193()
+lcd = LCD1602.LCD1602(16, 2, warm=True)  # Skips the init if already set up
+led = LCD1602.SN3193(warm=True)
+glyphs = GlyphManager(lcd)
 
 # Custom characters
 firework1 = [
@@ -56,40 +59,35 @@ heart_char = [
     0b00000
 ]
 
+# Custom characters are uploaded to CGRAM on first use
+glyphs.register('firework1', firework1)
+glyphs.register('firework2', firework2)
+glyphs.register('firework3', firework3)
+glyphs.register('heart', heart_char)
+
 # Message and fireworks scroll content
 message = "HAPPY FOURTH OF JULY!!   "
-fw_display = chr(0) + chr(1) + chr(2) + "   "
 
 try:
     lcd.clear()
     led.set_brightness(100)
 
-    # Load custom characters
-    lcd.createChar(0, firework1)
-    lcd.createChar(1, firework2)
-    lcd.createChar(2, firework3)
-    lcd.createChar(3, heart_char)
-
-    scroll_len = len(message) - 15
-
-    # Scroll message and fireworks
-    for i in range(scroll_len):
-        lcd.setCursor(0, 0)
-        lcd.printout(message[i:i+16].ljust(16))
-
-        fw = fw_display[i % len(fw_display):] + fw_display[:i % len(fw_display)]
-        lcd.setCursor(0, 1)
-        lcd.printout((fw + " " * 16)[:16])
-
-        time.sleep(0.3)
+    # Scroll message and fireworks; line 2 repeats the fireworks
+    glyphs.begin_frame()
+    fw_display = glyphs.use('firework1', 'firework2', 'firework3') + "   "
+    marquee = LCD1602.Marquee(lcd, message, (fw_display * len(message))[:len(message)])
+    timeline = Timeline(0.3)  # Frames on fixed deadlines, no drift
+    for frame in timeline.frames(marquee.steps):
+        marquee.seek(frame)  # Loads DDRAM at frame 0, then one shift per step
+    timeline.wait()  # Hold the last frame for its full period
+    marquee.stop()
 
     # Display hearts and blessing
-    heart = chr(3)
-    lcd.clear()
-    lcd.setCursor(0, 0)
-    lcd.printout(f"{heart} GOD BLESS {heart}")
-    lcd.setCursor(0, 1)
-    lcd.printout(f"{heart}  AMERICA!  {heart}")
+    glyphs.begin_frame()
+    lcd.clearFrame()
+    lcd.draw(0, 0, glyphs.format("{heart} GOD BLESS {heart}"))
+    lcd.draw(0, 1, glyphs.format("{heart}  AMERICA!  {heart}"))
+    lcd.flush()
 
     time.sleep(6)
 
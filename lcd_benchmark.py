@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Benchmarks typical LCD1602 workloads: transactions, bytes and time per
+# operation. With --fake it runs on a simulated bus and reports simulated
+# bus time, so it works on any Linux box
+
+import argparse
+import sys
+sys.path.append('./lcdlib')  # Adjust if your path is different
+
+import LCD1602
+import busmanager
+import fakebus
+import lcdstate
+import panels
+import tempfile
+import time
+from bigdigits import BigDigits
+from lcd_service import LCDService
+
+LINES = [
+    "Success means do",
+    "ing the best we ",
+    "can with what we",
+    " have. Blessed! ",
+]
+
+QUOTE = (
+    "Success means doing the best we can with what we have. "
+    "Success is the doing, not the getting.   "
+)
+
+HEART = [0b00000, 0b01010, 0b11111, 0b11111, 0b11111, 0b01110, 0b00100, 0b00000]
+HEART_OUTLINE = [0b00000, 0b01010, 0b10101, 0b10001, 0b10001, 0b01010, 0b00100, 0b00000]
+
+
+# === Workloads: each runs n operations ===
+
+# Both rows, one I2C transaction per character, as the driver used to do
+def redraw_per_byte(lcd, n):
+    for i in range(n):
+        for row in range(2):
+            lcd.setCursor(0, row)
+            for x in bytearray(LINES[(i + row) % len(LINES)], 'utf-8'):
+                lcd.data(x)
+
+
+# Per-byte writes again, queued in a batch and sent merged
+def redraw_batched(lcd, n):
+    for i in range(n):
+        with LCD1602.I2C.batch():
+            redraw_per_byte(lcd, 1)
+
+
+# Both rows with setCursor and printout
+def redraw_block(lcd, n):
+    for i in range(n):
+        for row in range(2):
+            lcd.setCursor(0, row)
+            lcd.printout(LINES[(i + row) % len(LINES)])
+
+
+# Both rows through the frame buffer
+def redraw_framebuffer(lcd, n):
+    for i in range(n):
+        for row in range(2):
+            lcd.draw(0, row, LINES[(i + row) % len(LINES)])
+        lcd.flush()
+
+
+# One scroll step by rewriting the 16 visible characters
+def scroll_rewrite(lcd, n):
+    for i in range(n):
+        i %= len(QUOTE) - 15
+        lcd.setCursor(0, 0)
+        lcd.printout(QUOTE[i:i + 16])
+
+
+# One scroll step with the hardware display shift
+def scroll_marquee(lcd, n):
+    marquee = LCD1602.Marquee(lcd, QUOTE)
+    for i in range(n):
+        marquee.seek(i % marquee.steps)
+    marquee.stop()
+
+
+# One second of a clock display
+def clock_tick(lcd, n):
+    for i in range(n):
+        h, m, s = i // 3600 % 24, i // 60 % 60, i % 60
+        lcd.draw(0, 0, "2025 07 04 05")
+        lcd.draw(0, 1, f"{h:02}:{m:02}:{s:02}")
+        lcd.flush()
+
+
+# One second of a big-digit clock, the colon blinking
+def big_clock_tick(lcd, n):
+    big = BigDigits(lcd)
+    for i in range(n):
+        colon = ':' if i % 2 == 0 else ' '
+        big.show(f"{i // 3600 % 24:02}{colon}{i // 60 % 60:02}")
+
+
+# Upload all 8 custom characters, alternating two bitmaps so every
+# upload changes the slot and is really sent
+def custom_chars(lcd, n):
+    for i in range(n):
+        bitmap = HEART if i % 2 == 0 else HEART_OUTLINE
+        for slot in range(8):
+            lcd.createChar(slot, bitmap)
+
+
+# Upload the same 8 custom characters again; createChar skips slots that
+# already hold the bitmap
+def cached_chars(lcd, n):
+    for i in range(n):
+        for slot in range(8):
+            lcd.createChar(slot, HEART)
+
+
+# Characters each redraw puts on the panel, for the chars/s column
+REDRAW_CHARS = 32
+
+WORKLOADS = [
+    ("redraw per-byte", redraw_per_byte),
+    ("redraw batched", redraw_batched),
+    ("redraw block", redraw_block),
+    ("redraw framebuf", redraw_framebuffer),
+    ("scroll rewrite", scroll_rewrite),
+    ("scroll marquee", scroll_marquee),
+    ("clock tick", clock_tick),
+    ("big clock tick", big_clock_tick),
+    ("custom chars x8", custom_chars),
+    ("chars cached x8", cached_chars),
+]
+
+
+def measure(bus, lcd, name, workload, n):
+    fake = bus.bus if isinstance(bus.bus, fakebus.FakeBus) else None
+    lcd.clear()
+    lcd.clearFrame()
+    time.sleep(0.005)  # Let the clear finish outside the measurement
+    if fake:
+        fake.reset_stats()
+    transactions, nbytes = bus.transactions, bus.bytes
+    start = time.perf_counter()
+    workload(lcd, n)
+    elapsed = time.perf_counter() - start
+    if fake:
+        elapsed = fake.elapsed  # Simulated bus time
+    rate = ""
+    if name.startswith("redraw") and elapsed > 0:
+        rate = f"{REDRAW_CHARS * n / elapsed:9.0f}"
+    print(f"{name:<16} {(bus.transactions - transactions) / n:8.1f} "
+          f"{(bus.bytes - nbytes) / n:8.1f} {elapsed / n * 1000:9.3f} {rate}".rstrip())
+
+
+# Caller-side cost of posting frames to the display service
+def service(lcd, n):
+    lcd.clear()
+    with LCDService(lcd) as svc:
+        start = time.perf_counter()
+        for i in range(n):
+            svc.show(LINES[i % len(LINES)], LINES[(i + 1) % len(LINES)])
+        posted = time.perf_counter() - start
+        svc.wait()
+    print(f"service post {posted / n * 1e6:.1f} us, {svc.drawn} of {n} frames drawn")
+
+
+# Time to bring up the LCD and backlight, cold and from a warm state
+def startup(bus, n):
+    for warm in (False, True):
+        transactions = bus.transactions
+        start = time.perf_counter()
+        for _ in range(n):
+            lcd = LCD1602.LCD1602(16, 2, warm=warm)
+            led = LCD1602.SN3193(warm=warm)
+            lcd.saveState()  # As a warm script does on exit
+            led.save_state()
+        elapsed = time.perf_counter() - start
+        name = "startup warm" if warm else "startup cold"
+        print(f"{name:<16} {(bus.transactions - transactions) / n:8.1f} "
+              f"{'':8} {elapsed / n * 1000:9.1f} (wall)")
+
+
+# A wall of panels, each on its own simulated bus, refreshed as a group.
+# The group's time is the slowest bus; one after another it is the sum
+def panel_wall(count, n):
+    buses = [busmanager.BusManager(fakebus.FakeBus(log=False, name=f"fake{i}"))
+             for i in range(count)]
+    wall = [LCD1602.LCD1602(16, 2, bus=bus) for bus in buses]
+    for bus in buses:
+        bus.bus.reset_stats()
+    with panels.PanelGroup(wall) as group:
+        for i in range(n):
+            group.show([(LINES[(i + k) % len(LINES)], LINES[(i + k + 1) % len(LINES)])
+                        for k in range(count)])
+    elapsed = [bus.bus.elapsed for bus in buses]
+    print(f"panel wall x{count}: group {max(elapsed) / n * 1000:.3f} sim ms/frame, "
+          f"one at a time {sum(elapsed) / n * 1000:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LCD1602 workload benchmark")
+    parser.add_argument("-n", type=int, default=100, help="operations per workload")
+    parser.add_argument("--fake", action="store_true", help="run on a simulated bus")
+    parser.add_argument("--startup", type=int, default=3, metavar="N",
+                        help="driver start-ups to time, cold and warm")
+    parser.add_argument("--panels", type=int, default=4, metavar="N",
+                        help="panels in the simulated wall (with --fake)")
+    args = parser.parse_args()
+
+    if args.fake:
+        LCD1602.use_bus(busmanager.BusManager(fakebus.FakeBus(log=False)))
+        lcdstate.STATE_DIR = tempfile.mkdtemp()  # Keep the real panel's state
+    bus = LCD1602.I2C
+    lcd = LCD1602.LCD1602(16, 2)
+
+    clock = "sim ms/op" if args.fake else "ms/op"
+    print(f"{'workload':<16} {'txn/op':>8} {'bytes/op':>8} {clock:>9} {'chars/s':>9}")
+    try:
+        for name, workload in WORKLOADS:
+            measure(bus, lcd, name, workload, args.n)
+        service(lcd, args.n)
+        if args.startup:
+            startup(bus, args.startup)
+        if args.fake and args.panels:
+            panel_wall(args.panels, args.n)
+        print(f"bus busy {bus.utilization():.1%}, {bus.merged} transactions merged away")
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        lcd.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,54 @@
 # -*- coding: utf-8 -*-
+# LCD1602 and SN3193 driver shared by Raspberry Pi, Jetson Nano (CPython,
+# smbus) and Pico, ESP32 (MicroPython, machine.I2C); lcdbus.py picks the bus
 import time
-from smbus import SMBus
+import lcdbus
 
-I2C = SMBus(1)
+try:
+    import charmap  # Unicode to ROM codes; MicroPython has no str.translate
+except ImportError:
+    charmap = None
+
+I2C = lcdbus.default_bus()  # Opened on first use
+
+# Millisecond ticks for scheduled delays; MicroPython's wrap around
+if hasattr(time, 'ticks_ms'):
+    _ticks_ms = time.ticks_ms
+    _ticks_diff = time.ticks_diff
+    _sleep_ms = time.sleep_ms
+else:
+    def _ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def _ticks_diff(a, b):
+        return a - b
+
+    def _sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+
+# Swap the bus used by the LCD and backlight drivers, e.g. for a FakeBus.
+# Instances given their own bus keep it
+def use_bus(bus):
+    global I2C
+    I2C = bus
+
+
+# Warm-start state name for a device; one on its own bus gets its own file
+def _state_name(kind, bus, address):
+    if bus is None:
+        return '%s-%02x' % (kind, address)
+    return '%s-%s-%02x' % (kind, getattr(bus, 'name', 'bus'), address)
+
+
+# Drop the warm-start state of a device that has just been set up cold, so
+# a later warm start does not trust what it recorded
+def _discard_state(name):
+    try:
+        import lcdstate
+    except ImportError:
+        return
+    lcdstate.discard(name)
 
 # LCD1602 LCD commands and addresses
 LCD_ADDRESS = (0x7c >> 1)  # LCD I2C address
@@ -44,24 +90,146 @@ LCD_2LINE = 0x08
 LCD_1LINE = 0x00
 LCD_5x8DOTS = 0x00
 
+# DDRAM layout: two 40-cell lines, second line starts at 0x40
+DDRAM_WIDTH = 40
+DDRAM_LINE2 = 0x40
+
+# Control bytes: Co=1 means one byte follows and then another control byte
+CTRL_COMMAND = 0x80  # One command byte
+CTRL_COMMANDS = 0x00  # Run of command bytes to the end of the transfer
+CTRL_DATA = 0x40  # Run of data bytes to the end of the transfer
+
+# SMBus block writes carry at most 32 bytes after the control byte
+I2C_BLOCK_MAX = 32
+
+# Unchanged cells resent in flush() rather than moving the cursor; a cursor
+# move costs two extra bytes in the same transfer
+FLUSH_GAP = 2
+
 
 class LCD1602:
-  def __init__(self, col, row):
+  # warm: skip the power-on sequence if this boot already configured the
+  # panel (state kept by lcdstate.py), sending only what differs.
+  # bus, address: for more than one panel, e.g. a bus per panel or a
+  # channel of an I2C mux (panels.py); the module's I2C by default
+  def __init__(self, col, row, warm=False, bus=None, address=LCD_ADDRESS):
     self._row = row
     self._col = col
+    self.bus = bus
+    self.address = address
+
+    # Shadow copy of DDRAM and the frame being drawn, one row per line
+    self._shadow = [bytearray(b' ' * DDRAM_WIDTH) for _ in range(2)]
+    self._frame = [bytearray(b' ' * DDRAM_WIDTH) for _ in range(2)]
+    self._addr = None  # DDRAM address counter, None when unknown
+    self._shift = 0  # Display shift, positive is left
+    self._cgram = [None] * 8  # Bitmap loaded in each CGRAM slot, if known
+    self._busy_until = _ticks_ms()  # Tick the controller is free again
+
+    # Transfer buffer with a view per length, so writes allocate nothing
+    self._tx = bytearray(I2C_BLOCK_MAX)
+    tx = memoryview(self._tx)
+    self._views = [tx[:n] for n in range(I2C_BLOCK_MAX + 1)]
+
+    # Character table for printout, draw and Marquee (charmap.py)
+    self.charmap = charmap.ROM if charmap is not None else None
 
     # Set the display function (4-bit mode, 1-line, 5x8 font)
     self._showfunction = LCD_4BITMODE | LCD_1LINE | LCD_5x8DOTS;
-    self.begin(self._row,self._col)
+    state = None
+    if warm:
+        import lcdstate
+        state = lcdstate.take(self._stateName())
+        lcdstate.on_exit(self.saveState)
+    if state:
+        self._restore(state, self._col)
+    else:
+        self.begin(self._row,self._col)
 
         
+  # Wait out a delay scheduled by an earlier command, if still pending
+  def _ready(self):
+      delay = _ticks_diff(self._busy_until, _ticks_ms())
+      if delay > 0:
+          _sleep_ms(delay)
+
+  # This panel's bus
+  def _i2c(self):
+      return I2C if self.bus is None else self.bus
+
+  # Delay the next write after a slow command, unless the bus queues this
+  # one and waits it out itself (BusManager.batch)
+  def _busyFor(self, ms):
+      settles = getattr(self._i2c(), 'settles', None)
+      if settles is None or not settles(self.address):
+          self._busy_until = _ticks_ms() + ms
+
   # Send command to the LCD
   def command(self, cmd):
-      I2C.write_byte_data(LCD_ADDRESS,0x80,cmd)
+      self._ready()
+      self._i2c().write_byte_data(self.address,0x80,cmd)
 
   # Send data to the LCD
   def data(self, data):
-      I2C.write_byte_data(LCD_ADDRESS,0x40,data)
+      self._ready()
+      self._i2c().write_byte_data(self.address,0x40,data)
+      self._track(data)
+
+  # Send a run of commands in one transfer
+  def commands(self, cmds):
+      self._ready()
+      n = len(cmds)
+      for i in range(n):
+          self._tx[i] = cmds[i]
+      self._i2c().write_block(self.address, CTRL_COMMANDS, self._views[n])
+
+  # Send buf[start:end] as data runs, the first one optionally preceded by a
+  # command; each transfer is split at I2C_BLOCK_MAX bytes
+  def _write(self, buf, start=0, end=None, cmd=None):
+      if end is None:
+          end = len(buf)
+      self._ready()
+      tx = self._tx
+      i2c = self._i2c()
+      while start < end:
+          if cmd is not None:
+              tx[0] = cmd
+              tx[1] = CTRL_DATA
+              control, n = CTRL_COMMAND, 2
+              cmd = None
+          else:
+              control, n = CTRL_DATA, 0
+          count = min(end - start, I2C_BLOCK_MAX - n)
+          for i in range(count):
+              tx[n + i] = buf[start + i]
+          i2c.write_block(self.address, control, self._views[n + count])
+          for i in range(count):
+              self._track(tx[n + i])
+          start += count
+
+  # Mirror a data write into the shadow and move the address counter the
+  # way the entry mode does: up or down, wrapping to the other line, and
+  # shifting the display with autoscroll on
+  def _track(self, data):
+      if self._addr is None:
+          return  # Writing to CGRAM
+      row = self._addr >> 6  # Second line starts at 0x40
+      col = self._addr & 0x3f
+      self._shadow[row][col] = data
+      if self._showmode & LCD_ENTRYLEFT:
+          if col + 1 < DDRAM_WIDTH:
+              self._addr += 1
+          else:
+              self._addr = DDRAM_LINE2 * (1 - row)  # Wraps to the other line
+          step = 1
+      else:
+          if col > 0:
+              self._addr -= 1
+          else:
+              self._addr = DDRAM_LINE2 * (1 - row) + DDRAM_WIDTH - 1
+          step = -1
+      if self._showmode & LCD_ENTRYSHIFTINCREMENT:
+          self._shift += step  # Left when writing left to right
 
   # Set the cursor position
   def setCursor(self, col, row):
@@ -70,33 +238,121 @@ class LCD1602:
       else:
           col |= 0xc0  # Set address for the second row
       self.command(col)
+      self._addr = col & 0x7f
 
   # Clear the LCD display
   def clear(self):
       self.command(LCD_CLEARDISPLAY)  # Send clear command
-      time.sleep(0.005)  # Wait for the command to execute
+      # The command takes 5 ms; the next write waits for it instead of us
+      self._busyFor(5)
+      for line in self._shadow:
+          line[:] = b' ' * DDRAM_WIDTH
+      self._addr = 0
+      self._shift = 0
+      self._showmode |= LCD_ENTRYLEFT  # Clearing also sets left to right
+
+  # Return the cursor home and undo any display shift
+  def home(self):
+      self.command(LCD_RETURNHOME)
+      self._busyFor(3)  # Takes 1.5 ms
+      self._addr = 0
+      self._shift = 0
+
+  # Write text or bytes into the frame buffer; nothing is sent until flush()
+  def draw(self, col, row, text):
+      if isinstance(text, int):
+          text = str(text)
+      if isinstance(text, str):
+          text = self.encode(text)
+      line = self._frame[row]
+      buf = text[:DDRAM_WIDTH - col]
+      line[col:col + len(buf)] = buf
+
+  # Blank the frame buffer
+  def clearFrame(self):
+      for line in self._frame:
+          line[:] = b' ' * DDRAM_WIDTH
+
+  # Send only the cells that differ from the shadow copy of DDRAM
+  def flush(self):
+      for row in range(2):
+          frame, shadow = self._frame[row], self._shadow[row]
+          if frame == shadow:
+              continue
+          col = 0
+          while col < DDRAM_WIDTH:
+              if frame[col] == shadow[col]:
+                  col += 1
+                  continue
+              # Extend the run across short stretches of unchanged cells
+              end = col + 1
+              gap = 0
+              while end + gap < DDRAM_WIDTH and gap <= FLUSH_GAP:
+                  if frame[end + gap] != shadow[end + gap]:
+                      end += gap + 1
+                      gap = 0
+                  else:
+                      gap += 1
+              self.writeAt(col, row, frame, col, end)
+              col = end
+
+  # Write buf[start:end] at a DDRAM position, moving the cursor only if needed
+  def writeAt(self, col, row, buf, start=0, end=None):
+      addr = row * DDRAM_LINE2 + col
+      if self._addr != addr:
+          self._addr = addr
+          self._write(buf, start, end, LCD_SETDDRAMADDR | addr)
+      else:
+          self._write(buf, start, end)
 
   # Print a string or number to the display
   def printout(self, arg):
       if isinstance(arg, int):
           arg = str(arg)  # Convert integer to string
-      for x in bytearray(arg, 'utf-8'):  # Send each character to LCD
-          self.data(x)
+      addr = self._addr
+      buf = self.encode(arg)
+      if addr is not None and self._addr != addr:
+          # Uploading a bound glyph left the address counter in CGRAM
+          self.writeAt(addr % DDRAM_LINE2, addr // DDRAM_LINE2, buf)
+      else:
+          self._write(buf)  # Send the whole string as one run
+
+  # Text as one byte per cell through the character map, or as UTF-8
+  # where there is none
+  def encode(self, text):
+      if self.charmap is not None:
+          return self.charmap.encode(text)
+      return bytearray(text, 'utf-8')
 
   # Create a custom character at a specified location
   def createChar(self, location, charmap):
       location = location & 0x7  # Ensure location is within bounds (0-7)
-      self.command(LCD_SETCGRAMADDR | (location << 3))  # Set CGRAM address
-      for i in range(0, 8):
-          self.data(charmap[i])  # Write the character map data to CGRAM
+      # Compare in place, so a glyph already loaded costs no allocation
+      loaded = self._cgram[location]
+      if loaded is not None:
+          for i in range(8):
+              if loaded[i] != charmap[i]:
+                  break
+          else:
+              return  # Already loaded
+      self._addr = None  # Data now goes to CGRAM
+      # Set CGRAM address and write the character map in one transfer
+      self._write(charmap, 0, 8, LCD_SETCGRAMADDR | (location << 3))
+      self._cgram[location] = bytes(charmap[:8])  # Copied only on change
+
+  # Bitmap loaded in a CGRAM slot, or None if not known
+  def loadedChar(self, location):
+      return self._cgram[location & 0x7]
 
   # Scroll the display left
   def scrollDisplayLeft(self):
       self.command(LCD_CURSORSHIFT | LCD_DISPLAYMOVE | LCD_MOVELEFT)
+      self._shift += 1
 
   # Scroll the display right
   def scrollDisplayRight(self):
       self.command(LCD_CURSORSHIFT | LCD_DISPLAYMOVE | LCD_MOVERIGHT)
+      self._shift -= 1
 
   # Turn on the underline cursor
   def cursor(self):
@@ -135,6 +391,7 @@ class LCD1602:
 
   # Initialize the LCD (send necessary commands for configuration)
   def begin(self, cols, lines):
+      _discard_state(self._stateName())
       if lines > 1:
           self._showfunction |= LCD_2LINE  # Enable 2-line display
       self._numlines = lines
@@ -146,19 +403,119 @@ class LCD1602:
       time.sleep(0.005)
       self.command(LCD_FUNCTIONSET | self._showfunction)
       time.sleep(0.005)
-      self.command(LCD_FUNCTIONSET | self._showfunction)
-      self.command(LCD_FUNCTIONSET | self._showfunction)
 
-      # Turn on display with no cursor or blinking
+      # Turn on display with no cursor or blinking, and set entry mode for
+      # text direction (left to right), in one transfer
       self._showcontrol = LCD_DISPLAYON | LCD_CURSOROFF | LCD_BLINKOFF
-      self.display()
+      self._showmode = LCD_ENTRYLEFT | LCD_ENTRYSHIFTDECREMENT
+      self.commands([LCD_FUNCTIONSET | self._showfunction,
+                     LCD_FUNCTIONSET | self._showfunction,
+                     LCD_DISPLAYCONTROL | self._showcontrol,
+                     LCD_ENTRYMODESET | self._showmode])
 
       # Clear the screen
       self.clear()
 
-      # Set entry mode for text direction (left to right)
+  # === Warm start ===
+
+  def _stateName(self):
+      return _state_name('lcd1602', self.bus, self.address)
+
+  # Save what the panel holds so the next warm start can skip the init
+  def saveState(self):
+      import lcdstate
+      lcdstate.save(self._stateName(), {
+          'function': self._showfunction,
+          'control': self._showcontrol,
+          'mode': self._showmode,
+          'shift': self._shift % DDRAM_WIDTH,
+          'ddram': [bytes(line).hex() for line in self._shadow],
+          'cgram': [None if b is None else b.hex() for b in self._cgram],
+      })
+
+  # Bring a configured panel to the state begin() leaves, sending only the
+  # settings that differ. The screen keeps its content, which the shadow
+  # records, so the first flush() only sends the changes
+  def _restore(self, state, lines):
+      if lines > 1:
+          self._showfunction |= LCD_2LINE
+      self._numlines = lines
+      self._currline = 0
+      self._showcontrol = LCD_DISPLAYON | LCD_CURSOROFF | LCD_BLINKOFF
       self._showmode = LCD_ENTRYLEFT | LCD_ENTRYSHIFTDECREMENT
-      self.command(LCD_ENTRYMODESET | self._showmode)
+
+      cmds = []
+      if state['function'] != self._showfunction:
+          cmds.append(LCD_FUNCTIONSET | self._showfunction)
+      if state['control'] != self._showcontrol:
+          cmds.append(LCD_DISPLAYCONTROL | self._showcontrol)
+      if state['mode'] != self._showmode:
+          cmds.append(LCD_ENTRYMODESET | self._showmode)
+      if cmds:
+          self.commands(cmds)
+      if state['shift']:
+          self.home()
+
+      for line, saved in zip(self._shadow, state['ddram']):
+          line[:] = bytes.fromhex(saved)
+      self._cgram = [None if b is None else bytes.fromhex(b) for b in state['cgram']]
+
+
+# Scrolls up to two lines of long text with the controller's display shift.
+# DDRAM holds a 40 cell window of the text; each step is one shift command,
+# and cells that have scrolled off the left are refilled in batches with the
+# text coming up on the right. The shift moves both lines together.
+class Marquee:
+    def __init__(self, lcd, *lines, width=16):
+        self.lcd = lcd
+        self.width = width
+        self.lines = [bytearray(lcd.encode(str(text))) for text in lines[:2]]
+        self.length = max(len(line) for line in self.lines)
+        self.steps = max(1, self.length - width + 1)  # Windows to show
+        self.pos = 0  # Text index at the left edge of the display
+        self._loaded = 0  # Text before this index has been written to DDRAM
+
+    # Load the first window and reset the display shift
+    def start(self):
+        self.lcd.home()
+        self.pos = 0
+        self._loaded = 0
+        self._load(min(self.length, DDRAM_WIDTH))
+
+    # Scroll one step left; returns False once the end of the text is shown
+    def step(self):
+        if self.pos + 1 >= self.steps:
+            return False
+        if self.pos + 1 + self.width > self._loaded:
+            # Everything left of the visible window is free to refill
+            self._load(min(self.length, self.pos + DDRAM_WIDTH))
+        self.lcd.scrollDisplayLeft()
+        self.pos += 1
+        return True
+
+    # Show the window starting at pos, e.g. after a scheduler skipped frames.
+    # Going back, or seeking before start(), starts over from the beginning
+    def seek(self, pos):
+        if pos < self.pos or not self._loaded:
+            self.start()
+        while self.pos < pos and self.step():
+            pass
+
+    # Undo the display shift so normal drawing lines up again
+    def stop(self):
+        self.lcd.home()
+
+    # Write text positions [_loaded, end) into their DDRAM cells
+    def _load(self, end):
+        start = self._loaded
+        while start < end:
+            col = start % DDRAM_WIDTH
+            stop = min(end, start + DDRAM_WIDTH - col)  # Do not wrap the line
+            for row, line in enumerate(self.lines):
+                run = line[start:stop]
+                self.lcd.writeAt(col, row, run + b' ' * (stop - start - len(run)))
+            start = stop
+        self._loaded = end
 
 
 # SN3193 Backlight control
@@ -193,8 +550,32 @@ TIME_UPDATE_REG = 0x1C  # Load time register data
 LED_CONTROL_REG = 0x1D  # Enable OUT1~OUT3
 RESET_REG = 0x2F  # Reset all registers to default values
 
+# Breathing timer codes programmed at init: T0, T1, T2, T3, T4
+SN3193_TIMERS = (4, 3, 2, 3, 2)
+
 class SN3193:
-    def __init__(self):
+    # warm: skip the register program if this boot already ran it.
+    # bus, address: as for LCD1602
+    def __init__(self, warm=False, bus=None, address=SN3193_IIC_ADDRESS):
+        self.bus = bus
+        self.address = address
+        self._busy_until = _ticks_ms()  # Tick the chip is free again
+        # PWM_1..PWM_3 and the update register, written as one block
+        self._pwm = bytearray([0xFF, 0x00, 0x00, 0x00])
+        self._mode = LED_NORNAL_MODE
+        self._timers = SN3193_TIMERS
+
+        state = None
+        if warm:
+            import lcdstate
+            state = lcdstate.take(_state_name('sn3193', bus, address))
+            lcdstate.on_exit(self.save_state)
+        if state:
+            self._restore(state)
+            return
+
+        _discard_state(_state_name('sn3193', bus, address))
+
         # Initialize SN3193 with default settings
         self.write_bytes(SHUTDOWN_REG, 0x20)  # Set software shutdown mode
         self.write_bytes(LED_MODE_REG, LED_NORNAL_MODE)  # Set normal operation mode
@@ -220,9 +601,40 @@ class SN3193:
         self.write_bytes(TIME_UPDATE_REG, 0x00)  # Load time register data
         time.sleep(0.1)
 
+    # Wait out a delay scheduled by an earlier write, if still pending
+    def _ready(self):
+        delay = _ticks_diff(self._busy_until, _ticks_ms())
+        if delay > 0:
+            _sleep_ms(delay)
+
+    def _i2c(self):
+        return I2C if self.bus is None else self.bus
+
     # Function to write a byte to a specific register of SN3193
     def write_bytes(self, Cmd, Data):
-        I2C.write_byte_data(SN3193_IIC_ADDRESS,Cmd,Data)
+        self._ready()
+        self._i2c().write_byte_data(self.address,Cmd,Data)
+
+    # Set the OUT1 duty cycle (0-255) and load it in one transfer; the
+    # register address increments from PWM_1_REG through PWM_UPDATE_REG
+    def set_pwm(self, duty):
+        self._pwm[0] = duty
+        self._ready()
+        self._i2c().write_block(self.address, PWM_1_REG, self._pwm)
+
+    # Breathe OUT1 on the chip's own timers, no host work needed afterwards.
+    # Time codes: t0 start delay, t1 rise, t2 hold on, t3 fall, t4 hold off
+    def breathe(self, t0, t1, t2, t3, t4):
+        self._set_timers((t0, t1, t2, t3, t4))
+        self.set_mode(LED_BREATH_MODE)
+
+    def _set_timers(self, timers):
+        t0, t1, t2, t3, t4 = timers
+        self.write_bytes(T0_1_REG, t0 << 4)
+        self.write_bytes(T1T2_1_REG, (t2 << 4) | (t1 << 1))
+        self.write_bytes(T3T4_1_REG, (t4 << 4) | (t3 << 1))
+        self.write_bytes(TIME_UPDATE_REG, 0x00)  # Load time register data
+        self._timers = tuple(timers)
 
     # Set the brightness of the LEDs (value between 0 and 100)
     def set_brightness(self, Value):
@@ -230,11 +642,30 @@ class SN3193:
             print("Please enter a value between 0 and 100.")
         else:
             # Convert percentage value to 8-bit scale (0x00 to 0xFF)
-            self.write_bytes(PWM_1_REG, round(Value * (0xFF / 100)))
-            time.sleep(0.1)
-            self.write_bytes(PWM_UPDATE_REG, 0x00)  # Apply brightness update
+            self.set_pwm(round(Value * (0xFF / 100)))
 
     # Set the operation mode of the LEDs (e.g., breathing mode or steady mode)
     def set_mode(self, Mode):
         self.write_bytes(LED_MODE_REG, Mode)  # Set the operation mode
-        # Mode options: 0x20 for breathing mode, 0x00 for steady mode
\ No newline at end of file
+        self._mode = Mode
+        # Mode options: 0x20 for breathing mode, 0x00 for steady mode
+
+    # Save the register state so the next warm start can skip the init
+    def save_state(self):
+        import lcdstate
+        lcdstate.save(_state_name('sn3193', self.bus, self.address), {
+            'pwm': list(self._pwm),
+            'mode': self._mode,
+            'timers': list(self._timers),
+        })
+
+    # Bring a programmed chip back to the init settings, writing only the
+    # registers that differ
+    def _restore(self, state):
+        self._pwm[1:] = bytes(state['pwm'][1:])
+        if tuple(state['timers']) != SN3193_TIMERS:
+            self._set_timers(SN3193_TIMERS)
+        if state['mode'] != LED_NORNAL_MODE:
+            self.set_mode(LED_NORNAL_MODE)
+        if state['pwm'][0] != 0xFF:
+            self.set_pwm(0xFF)
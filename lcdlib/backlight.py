@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# Backlight effects for the SN3193. Fades, software pulses and brightness
+# that follows a value run on a background thread that sleeps when idle;
+# pulses that start from off use the chip's own breathing timers instead
+import math
+import threading
+import time
+
+import LCD1602
+
+# Software effects step at this interval, in seconds
+STEP_INTERVAL = 0.02
+
+# SN3193 timer codes and their approximate times in seconds: T1 (rise) and
+# T3 (fall) double from 0.13 s; T0, T2 and T4 start at 0 s
+RAMP_TIMES = [0.13 * 2 ** n for n in range(8)]
+HOLD_TIMES = [0.0] + [0.13 * 2 ** n for n in range(8)]
+
+
+# Fade curves map elapsed fraction 0..1 to progress 0..1
+def linear(t):
+    return t
+
+
+def smooth(t):
+    return t * t * (3 - 2 * t)
+
+
+# The timer code whose time is closest to seconds
+def _code(seconds, times):
+    return min(range(len(times)), key=lambda i: abs(times[i] - seconds))
+
+
+class Backlight:
+    def __init__(self, led=None):
+        self.led = led if led is not None else LCD1602.SN3193()
+        self.level = 100.0  # Percent, SN3193() starts at full brightness
+        self.writes = 0  # PWM transfers sent, for checking effect cost
+
+        self._effect = None  # Generator yielding levels, run by the worker
+        self._restart = False
+        self._running = True
+        self._breathing = False
+        self._duty = None  # Last PWM duty written
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="backlight", daemon=True)
+        self._worker.start()
+
+    # Jump to a level (0-100)
+    def set(self, level):
+        self._start(self._hold(level))
+
+    # Fade to a level over duration seconds
+    def fade(self, level, duration, curve=linear):
+        self._start(self._fade(level, duration, curve))
+
+    # Pulse between low and high every period seconds, count times or
+    # forever. From off this runs on the chip's breathing timers
+    def pulse(self, high=100, period=2.0, low=0, count=None):
+        if low <= 0 and count is None:
+            self._start(self._breathe(high, period))
+        else:
+            self._start(self._pulse(low, high, period, count))
+
+    # Follow source(), a function returning a level, checked every interval
+    # seconds and faded to so changes are smooth
+    def follow(self, source, interval=1.0):
+        self._start(self._follow(source, interval))
+
+    # Stop the current effect and hold the present level
+    def stop(self):
+        self._start(self._hold(self.level))
+
+    # Block until the current effect has finished; False on timeout
+    def wait(self, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._effect is None, timeout)
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self, effect):
+        with self._cond:
+            self._effect = effect
+            self._restart = True
+            self._cond.notify_all()
+
+    # === Worker ===
+
+    def _run(self):
+        next_step = time.monotonic()
+        while True:
+            with self._cond:
+                while self._running and self._effect is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                if self._restart:
+                    self._restart = False
+                    next_step = time.monotonic()
+                delay = next_step - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)  # A new effect wakes us early
+                    continue
+                effect = self._effect
+
+            try:
+                level = next(effect)
+            except StopIteration:
+                with self._cond:
+                    if self._effect is effect:
+                        self._effect = None
+                        self._cond.notify_all()
+                continue
+            if level is not None:
+                self._apply(level)
+
+            # Fixed deadlines; skip ahead if the bus made us late
+            next_step = max(next_step + STEP_INTERVAL, time.monotonic())
+
+    def _apply(self, level):
+        if self._breathing:
+            self.led.set_mode(LCD1602.LED_NORNAL_MODE)
+            self._breathing = False
+        self.level = min(100.0, max(0.0, level))
+        duty = round(self.level * 2.55)
+        if duty != self._duty:
+            self.led.set_pwm(duty)
+            self._duty = duty
+            self.writes += 1
+
+    # === Effects: generators yielding one level per step ===
+
+    def _hold(self, level):
+        yield level
+
+    def _fade(self, level, duration, curve):
+        start = self.level
+        steps = max(1, round(duration / STEP_INTERVAL))
+        for i in range(1, steps + 1):
+            yield start + (level - start) * curve(i / steps)
+
+    def _pulse(self, low, high, period, count):
+        steps = max(2, round(period / STEP_INTERVAL))
+        n = 0
+        while count is None or n < count:
+            for i in range(steps):
+                yield low + (high - low) * (1 - math.cos(2 * math.pi * i / steps)) / 2
+            n += 1
+        yield low
+
+    def _follow(self, source, interval):
+        while True:
+            target = source()
+            yield from self._fade(target, interval, smooth)
+
+    # Program the chip's breathing timers; nothing more to do afterwards
+    def _breathe(self, high, period):
+        self._apply(high)
+        ramp = _code(period * 0.4, RAMP_TIMES)
+        hold = _code(period * 0.1, HOLD_TIMES)
+        self.led.breathe(0, ramp, hold, ramp, hold)
+        self._breathing = True
+        yield None
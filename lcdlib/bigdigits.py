@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Two-row digits for LCD1602, built from 8 block glyphs that are uploaded
+# once into CGRAM slots 0-7 (all of them). Digits are 3 cells wide; ':',
+# '.' and ' ' are one. Text is drawn into the frame buffer, so a flush sends
+# only the cells that changed, a few bytes per second for a clock.
+#
+#   big = BigDigits(lcd)
+#   big.show("12:34")
+FULL = 0xFF  # ROM full block
+DOT = 0xA5  # ROM middle dot
+
+# Block glyphs: rounded corners, half bars and bars with a middle stroke
+SEGMENTS = [
+    [0b00111, 0b01111, 0b11111, 0b11111, 0b11111, 0b11111, 0b11111, 0b11111],  # 0 top left
+    [0b11111, 0b11111, 0b11111, 0b00000, 0b00000, 0b00000, 0b00000, 0b00000],  # 1 top bar
+    [0b11100, 0b11110, 0b11111, 0b11111, 0b11111, 0b11111, 0b11111, 0b11111],  # 2 top right
+    [0b11111, 0b11111, 0b11111, 0b11111, 0b11111, 0b11111, 0b01111, 0b00111],  # 3 bottom left
+    [0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b11111, 0b11111, 0b11111],  # 4 bottom bar
+    [0b11111, 0b11111, 0b11111, 0b11111, 0b11111, 0b11111, 0b11110, 0b11100],  # 5 bottom right
+    [0b11111, 0b11111, 0b11111, 0b00000, 0b00000, 0b00000, 0b11111, 0b11111],  # 6 top and middle
+    [0b11111, 0b00000, 0b00000, 0b00000, 0b00000, 0b11111, 0b11111, 0b11111],  # 7 middle and bottom
+]
+
+# Top and bottom row of each character, as cell codes
+FONT = {
+    '0': (bytes([0, 1, 2]), bytes([3, 4, 5])),
+    '1': (bytes([1, 2, 32]), bytes([4, FULL, 4])),
+    '2': (bytes([6, 6, 2]), bytes([3, 7, 7])),
+    '3': (bytes([6, 6, 2]), bytes([7, 7, 5])),
+    '4': (bytes([3, 4, 2]), bytes([32, 32, FULL])),
+    '5': (bytes([FULL, 6, 6]), bytes([7, 7, 5])),
+    '6': (bytes([0, 6, 6]), bytes([3, 7, 5])),
+    '7': (bytes([1, 1, 2]), bytes([32, 32, FULL])),
+    '8': (bytes([0, 6, 2]), bytes([3, 7, 5])),
+    '9': (bytes([0, 6, 2]), bytes([7, 7, 5])),
+    '-': (bytes([4, 4, 4]), b'   '),
+    ' ': (b' ', b' '),  # One column, e.g. a colon blinked off
+    ':': (bytes([DOT]), bytes([DOT])),
+    '.': (b' ', bytes([DOT])),
+}
+
+
+class BigDigits:
+    def __init__(self, lcd):
+        self.lcd = lcd
+        self.load()
+
+    # Upload the block glyphs; createChar skips slots that already hold them
+    def load(self):
+        for slot, bitmap in enumerate(SEGMENTS):
+            self.lcd.createChar(slot, bitmap)
+
+    # The two rows for text, with a blank column between neighbouring digits
+    def render(self, text):
+        top, bottom = bytearray(), bytearray()
+        prev = ''
+        for char in str(text):
+            upper, lower = FONT.get(char, FONT[' '])
+            if prev.isdigit() and char.isdigit():
+                top.append(32)
+                bottom.append(32)
+            top += upper
+            bottom += lower
+            prev = char
+        return top, bottom
+
+    # Cells that text takes up
+    def width(self, text):
+        return len(self.render(text)[0])
+
+    # Draw text into the frame buffer at col; nothing is sent until flush()
+    def draw(self, col, text):
+        top, bottom = self.render(text)
+        self.lcd.draw(col, 0, top)
+        self.lcd.draw(col, 1, bottom)
+
+    # Draw and send the cells that changed
+    def show(self, text, col=0):
+        self.draw(col, text)
+        self.lcd.flush()
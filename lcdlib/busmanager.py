@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# Shared access to one I2C bus. BusManager wraps a bus adapter with the same
+# interface, serializes writes from several threads, can also lock out other
+# processes with flock, and can queue writes in a batch and send them as
+# fewer, merged transactions. Only back-to-back writes to one device are
+# merged, so the order of writes across devices is kept on the wire. It
+# keeps counters for bus utilization.
+#
+#   bus = BusManager(lcdbus.SMBusAdapter(1), lock_path=busmanager.LOCK_PATH)
+#   LCD1602.use_bus(bus)
+#   with bus.batch():
+#       lcd.setCursor(0, 0)
+#       lcd.printout("Hello")
+#       led.set_pwm(128)
+#   print(bus.stats())
+import threading
+import time
+from contextlib import contextmanager
+
+LOCK_PATH = '/tmp/i2c-1.lock'  # Every process sharing the bus must use the same file
+
+BLOCK_MAX = 32  # Bytes after the register byte that smbus can send at once
+OVERHEAD_BYTES = 2  # A transaction costs about as much as 2 extra bytes at 100 kHz
+MAX_QUEUE = 256  # A batch sends what it has once this many writes are queued
+
+# Controller time needed after clear display and return home, in seconds
+CLEAR_TIME = 0.005
+HOME_TIME = 0.003
+
+
+# === Merging: each takes a run of one device's queued (reg, buf) writes and
+# returns the (reg, buf, settle seconds) transactions to send instead ===
+
+# Registers that auto-increment, like the SN3193's: a write that carries on
+# where the previous one ended joins it
+def merge_registers(writes):
+    merged = []
+    for reg, buf in writes:
+        if merged:
+            last_reg, last_buf, _ = merged[-1]
+            if last_reg + len(last_buf) == reg and len(last_buf) + len(buf) <= BLOCK_MAX:
+                merged[-1] = (last_reg, last_buf + buf, 0)
+                continue
+        merged.append((reg, buf, 0))
+    return merged
+
+
+# Split a control-byte transfer (AiP31068) into [is_data, bytes] runs.
+# Co=1 control bytes carry one byte each, Co=0 runs to the end
+def _runs(reg, buf):
+    runs = []
+    control, i = reg, 0
+    while i < len(buf):
+        if control & 0x80:
+            runs.append([control & 0x40, buf[i:i + 1]])
+            if i + 1 >= len(buf):
+                break
+            control, i = buf[i + 1], i + 2
+        else:
+            runs.append([control & 0x40, buf[i:]])
+            break
+    return _fuse(runs)
+
+
+# Neighbouring runs of the same kind are one run
+def _fuse(runs):
+    fused = []
+    for is_data, data in runs:
+        if fused and fused[-1][0] == is_data:
+            fused[-1][1] += data
+        else:
+            fused.append([is_data, bytes(data)])
+    return fused
+
+
+# Control bytes and payload for runs: only the last run may be Co=0
+def _encode(runs):
+    out = bytearray()
+    for is_data, data in runs[:-1]:
+        for value in data:
+            out.append(0x80 | is_data)
+            out.append(value)
+    is_data, data = runs[-1]
+    out.append(is_data)
+    out += data
+    return out
+
+
+def _settle(runs):
+    settle = 0
+    for is_data, data in runs:
+        if not is_data:
+            for cmd in data:
+                if cmd == 0x01:
+                    settle = max(settle, CLEAR_TIME)
+                elif cmd in (0x02, 0x03):
+                    settle = max(settle, HOME_TIME)
+    return settle
+
+
+# Devices addressed with control bytes, like the AiP31068 LCD controller.
+# Runs of one transfer join the next while the extra control bytes cost
+# less than a transaction; nothing joins a clear or home, which needs the
+# controller idle for milliseconds afterwards
+def merge_control_bytes(writes):
+    merged = []
+    group = None
+    for reg, buf in writes:
+        runs = _runs(reg, buf)
+        if not runs:
+            continue
+        if group is not None and not _settle(group):
+            candidate = _fuse(group + runs)
+            size = len(_encode(candidate))
+            if size <= BLOCK_MAX + 1 and size <= len(_encode(group)) + 1 + len(buf) + OVERHEAD_BYTES:
+                group = candidate
+                continue
+        if group is not None:
+            merged.append(group)
+        group = runs
+    if group is not None:
+        merged.append(group)
+
+    transactions = []
+    for runs in merged:
+        payload = _encode(runs)
+        transactions.append((payload[0], bytes(payload[1:]), _settle(runs)))
+    return transactions
+
+
+# How writes to each known device may be merged; others are sent as queued
+MERGERS = {
+    0x3E: merge_control_bytes,  # LCD1602 AiP31068
+    0x6B: merge_registers,  # SN3193 backlight
+}
+
+# Mergers that return the time a clear or home needs, so a batch waits it out
+SETTLING = (merge_control_bytes,)
+
+
+class BusManager:
+    def __init__(self, bus, lock_path=None, mergers=None):
+        self.bus = bus
+        self.lock_path = lock_path
+        self.mergers = MERGERS if mergers is None else mergers
+
+        self._lock = threading.RLock()
+        self._depth = 0  # Nesting of hold() on the owning thread
+        self._batching = 0
+        self._batch_thread = None  # Thread whose batch is open
+        self._queue = []  # (addr, reg, buf) waiting for the batch to end
+        self._lock_file = None
+
+        self.reset_stats()
+
+    # Traffic counters of the wrapped bus, after merging
+    @property
+    def transactions(self):
+        return self.bus.transactions
+
+    @property
+    def bytes(self):
+        return self.bus.bytes
+
+    @property
+    def name(self):
+        return getattr(self.bus, 'name', 'bus')
+
+    # --- Bus interface ---
+
+    def write_byte_data(self, addr, reg, value):
+        self.write_block(addr, reg, bytes((value,)))
+
+    def write_block(self, addr, reg, buf):
+        with self.hold():
+            if self._batching:
+                self.queued += 1
+                self._queue.append((addr, reg, bytes(buf)))
+                if len(self._queue) >= MAX_QUEUE:
+                    self._flush()
+            else:
+                self._send(addr, reg, buf)
+
+    # A bare byte such as an I2C mux channel select. It goes out at once,
+    # after anything already queued, so the order on the wire is kept
+    def write_byte(self, addr, value):
+        with self.hold():
+            self._flush()
+            start = time.perf_counter()
+            self.bus.write_byte(addr, value)
+            self.busy_time += time.perf_counter() - start
+
+    # True if a write to addr by this thread is queued and the batch waits
+    # out a clear or home when it is sent, so the driver need not sleep
+    def settles(self, addr):
+        return (self._batching > 0 and self._batch_thread == threading.get_ident()
+                and self.mergers.get(addr) in SETTLING)
+
+    def close(self):
+        with self.hold():
+            self._flush()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        if hasattr(self.bus, 'close'):
+            self.bus.close()
+
+    # --- Arbitration ---
+
+    # Keep the bus for a sequence of writes that must not be split up
+    @contextmanager
+    def hold(self):
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            self.waits += 1
+            self.wait_time += time.perf_counter() - start
+        try:
+            self._depth += 1
+            if self._depth == 1 and self.lock_path:
+                self._lock_process()
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self.lock_path:
+                self._unlock_process()
+            self._lock.release()
+
+    # Queue writes and send them merged when the outermost batch ends. The
+    # bus is held for the whole batch
+    @contextmanager
+    def batch(self):
+        with self.hold():
+            self._batching += 1
+            self._batch_thread = threading.get_ident()
+            try:
+                yield self
+            finally:
+                self._batching -= 1
+                if not self._batching:
+                    self._batch_thread = None
+                    self._flush()
+
+    def _lock_process(self):
+        import fcntl
+        if self._lock_file is None:
+            self._lock_file = open(self.lock_path, 'a')
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _unlock_process(self):
+        import fcntl
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # --- Sending ---
+
+    def _flush(self):
+        queue, self._queue = self._queue, []
+        runs = []  # [addr, [(reg, buf)]] for back-to-back writes to one device
+        for addr, reg, buf in queue:
+            if runs and runs[-1][0] == addr:
+                runs[-1][1].append((reg, buf))
+            else:
+                runs.append([addr, [(reg, buf)]])
+        for addr, device_writes in runs:
+            merge = self.mergers.get(addr)
+            if merge is None:
+                transactions = [(reg, buf, 0) for reg, buf in device_writes]
+            else:
+                transactions = merge(device_writes)
+            self.merged += len(device_writes) - len(transactions)
+            for reg, buf, settle in transactions:
+                self._send(addr, reg, buf)
+                if settle:
+                    time.sleep(settle)
+
+    def _send(self, addr, reg, buf):
+        start = time.perf_counter()
+        if len(buf) == 1:
+            self.bus.write_byte_data(addr, reg, buf[0])
+        else:
+            self.bus.write_block(addr, reg, buf)
+        self.busy_time += time.perf_counter() - start
+
+    # --- Statistics ---
+
+    def reset_stats(self):
+        self.queued = 0  # Writes that went through a batch
+        self.merged = 0  # Transactions saved by merging
+        self.waits = 0  # Times a thread had to wait for the bus
+        self.wait_time = 0.0
+        self.busy_time = 0.0  # Seconds spent in the wrapped bus
+        self._since = time.perf_counter()
+
+    # Fraction of wall time since reset_stats() that the bus was busy
+    def utilization(self):
+        elapsed = time.perf_counter() - self._since
+        return self.busy_time / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        return {'transactions': self.transactions, 'bytes': self.bytes,
+                'queued': self.queued, 'merged': self.merged,
+                'waits': self.waits, 'wait_time': self.wait_time,
+                'busy_time': self.busy_time, 'utilization': self.utilization()}
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Unicode to LCD1602 character codes. The AiP31068 has the HD44780 A00 ROM:
+# ASCII except backslash and tilde, half-width katakana and a few Greek and
+# accented letters. A CharMap compiles one str.translate table from that,
+# plus lookalikes and custom glyphs, so a whole string becomes one byte per
+# cell in a single pass with no per-character Python code.
+#
+#   cm = CharMap()
+#   cm.encode("21.5°C  ñ→ü")   # b'21.5\xdfC  \xee~\xf5'
+#
+#   glyphs = GlyphManager(lcd)
+#   glyphs.register('heart', HEART)
+#   lcd.charmap = CharMap(glyphs, {'♥': 'heart'})
+#   lcd.printout("I ♥ Pi")         # heart uploaded to CGRAM on first use
+try:
+    import unicodedata
+except ImportError:
+    unicodedata = None
+
+FALLBACK = '?'  # Shown for characters the display cannot draw
+PLACEHOLDER = 0xE000  # Private use characters standing in for bound glyphs
+
+# Non-ASCII characters in the A00 ROM, by code
+ROM_A00 = {
+    '¥': 0x5C, '→': 0x7E, '←': 0x7F,
+    '。': 0xA1, '「': 0xA2, '」': 0xA3, '、': 0xA4, '・': 0xA5,
+    '°': 0xDF, 'º': 0xDF,
+    'α': 0xE0, 'ä': 0xE1, 'β': 0xE2, 'ß': 0xE2, 'ε': 0xE3, 'μ': 0xE4,
+    'µ': 0xE4, 'σ': 0xE5, 'ρ': 0xE6, '√': 0xE8, '¢': 0xEC, 'ñ': 0xEE,
+    'ö': 0xEF, 'θ': 0xF2, '∞': 0xF3, 'Ω': 0xF4, 'ü': 0xF5, 'Σ': 0xF6,
+    'π': 0xF7, '÷': 0xFD, '█': 0xFF,
+}
+
+# Half-width katakana U+FF61-U+FF9F are ROM codes 0xA1-0xDF in order
+KATAKANA_START = 0xFF61
+KATAKANA_CODE = 0xA1
+KATAKANA_COUNT = 0x3F
+
+# Characters with no ROM glyph shown as something close
+LOOKALIKES = {
+    '~': '-', '‐': '-', '–': '-', '—': '-', '−': '-',
+    '‘': "'", '’': "'", '“': '"', '”': '"', '…': '.', '×': 'x',
+    '•': 0xA5, '·': 0xA5, '▶': '>', '◀': '<',
+}
+
+
+class CharMap:
+    def __init__(self, glyphs=None, bindings=None):
+        self.glyphs = glyphs  # GlyphManager for characters bound to glyphs
+        self._bindings = {}  # placeholder -> glyph name
+        self._placeholders = {}  # char -> placeholder
+        self._table = None
+        for char, name in (bindings or {}).items():
+            self.bind(char, name)
+        if self._table is None:
+            self._compile()
+
+    # Draw char with a custom glyph registered with the GlyphManager
+    def bind(self, char, name):
+        placeholder = self._placeholders.setdefault(char, chr(PLACEHOLDER + len(self._placeholders)))
+        self._bindings[placeholder] = name
+        self._compile()
+
+    # One byte per character, ready for the display
+    def encode(self, text):
+        text = text.translate(self._table)
+        try:
+            return text.encode('latin-1')
+        except UnicodeEncodeError:
+            pass
+        # Bound glyphs, looked up once per glyph rather than per character.
+        # Anything else left over cannot be drawn
+        if self.glyphs is not None:
+            present = [char for char in self._bindings if char in text]
+            if present:
+                slots = self.glyphs.use(*(self._bindings[char] for char in present))
+                text = text.translate({ord(c): s for c, s in zip(present, slots)})
+        return text.encode('latin-1', 'replace')
+
+    # Everything up to U+00FF gets an entry, since unmapped characters in that
+    # range would otherwise pass through as the wrong ROM code
+    def _compile(self):
+        table = {}
+        for code in range(0x100):
+            char = chr(code)
+            if code < 8:
+                table[code] = char  # CGRAM slots, e.g. from GlyphManager.use()
+            elif 0x20 <= code < 0x7F and char not in '\\~':
+                pass  # ASCII matches the ROM
+            else:
+                table[code] = _fallback(char)
+        for code in range(0x100, 0x250):  # Latin Extended, where a base letter exists
+            base = _fallback(chr(code))
+            if base.isalpha():
+                table[code] = base
+        for i in range(KATAKANA_COUNT):
+            table[KATAKANA_START + i] = chr(KATAKANA_CODE + i)
+        for char, code in ROM_A00.items():
+            table[ord(char)] = chr(code)
+        for char, lookalike in LOOKALIKES.items():
+            table[ord(char)] = chr(lookalike) if isinstance(lookalike, int) else lookalike
+        for char, placeholder in self._placeholders.items():
+            table[ord(char)] = placeholder  # Never encodes, so encode() fills it in
+        self._table = table
+
+
+# The nearest ASCII letter for accented Latin letters, e.g. é -> e
+def _fallback(char):
+    if unicodedata is not None and char.isalpha():
+        base = unicodedata.normalize('NFKD', char)[:1]
+        if base.isascii() and base.isalpha():
+            return base
+    return ' ' if char.isspace() or ord(char) < 0x20 else FALLBACK
+
+
+# Shared default table, compiled once on import
+ROM = CharMap()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Simulated I2C bus for running the LCD1602 and SN3193 drivers without the
+# hardware. It records every transaction, models the AiP31068's DDRAM, CGRAM
+# and address counter and the SN3193 registers, and keeps a simulated clock
+# from the bus and controller timings.
+#
+#   import LCD1602, fakebus
+#   bus = fakebus.FakeBus()
+#   LCD1602.use_bus(bus)
+#   lcd = LCD1602.LCD1602(16, 2)
+#   lcd.printout("Hello")
+#   print(bus.text(0), bus.transactions, bus.elapsed)
+
+LCD_ADDRESS = 0x3E
+SN3193_ADDRESS = 0x6B
+
+DDRAM_WIDTH = 40
+CGRAM_SIZE = 64
+
+# Bus timing: 100 kHz I2C, 9 clocks per byte plus start/stop, and the cost
+# of one ioctl on a Raspberry Pi
+I2C_FREQ = 100000
+BYTE_TIME = 9 / I2C_FREQ
+START_STOP_TIME = 2 / I2C_FREQ
+TRANSACTION_OVERHEAD = 60e-6
+
+# Controller execution times
+EXEC_TIME = 39e-6  # Most commands and data writes
+SLOW_EXEC_TIME = 1.53e-3  # Clear display and return home
+
+
+class FakeBus:
+    def __init__(self, log=True, name='fake'):
+        self.name = name
+        self.keep_log = log
+        self.log = []  # (addr, first byte, remaining bytes) per transaction
+
+        # Traffic counters, same meaning as SMBusAdapter's
+        self.transactions = 0
+        self.bytes = 0
+        self.elapsed = 0.0  # Simulated seconds spent on the bus
+        self._busy_until = 0.0  # Simulated time the controller is free again
+        self.stalls = 0  # Writes that had to wait for the controller
+
+        # AiP31068 state
+        self.ddram = [bytearray(b' ' * DDRAM_WIDTH) for _ in range(2)]
+        self.cgram = bytearray(CGRAM_SIZE)
+        self.addr = 0  # Address counter
+        self.in_cgram = False  # Whether data goes to CGRAM
+        self.increment = True
+        self.entry_shift = False  # Shift the display on each DDRAM write
+        self.shift = 0  # Display shift, positive is left
+        self.display_on = False
+        self.cursor_on = False
+        self.blink_on = False
+        self.function = 0
+
+        # SN3193 registers
+        self.led_regs = bytearray(0x30)
+
+    # --- Bus interface ---
+
+    def write_byte_data(self, addr, reg, value):
+        self._transfer(addr, [reg, value])
+
+    def write_block(self, addr, reg, buf):
+        self._transfer(addr, [reg] + list(buf))
+
+    def write_byte(self, addr, value):
+        self._transfer(addr, [value])
+
+    # The smbus name, so a FakeBus can also stand in for SMBus itself
+    write_i2c_block_data = write_block
+
+    # --- Inspection ---
+
+    # The characters visible on a row, taking the display shift into account
+    def visible(self, row, width=16):
+        line = self.ddram[row]
+        return bytes(line[(self.shift + i) % DDRAM_WIDTH] for i in range(width))
+
+    # Visible row as text, custom characters shown as their slot digit
+    def text(self, row, width=16):
+        return ''.join(str(b) if b < 8 else chr(b) for b in self.visible(row, width))
+
+    # The 8 row bitmap stored in a CGRAM slot
+    def glyph(self, slot):
+        return list(self.cgram[slot * 8:slot * 8 + 8])
+
+    def reset_stats(self):
+        self.log.clear()
+        self.transactions = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self._busy_until = 0.0
+        self.stalls = 0
+
+    def stats(self):
+        return {'transactions': self.transactions, 'bytes': self.bytes,
+                'seconds': self.elapsed, 'stalls': self.stalls}
+
+    # --- Model ---
+
+    def _transfer(self, addr, payload):
+        if self.keep_log:
+            self.log.append((addr, payload[0], bytes(payload[1:])))
+        self.transactions += 1
+        self.bytes += len(payload)
+
+        # The bytes must not arrive before the controller has finished
+        self.elapsed += TRANSACTION_OVERHEAD
+        if addr == LCD_ADDRESS and self.elapsed < self._busy_until:
+            self.elapsed = self._busy_until
+            self.stalls += 1
+        self.elapsed += START_STOP_TIME + (1 + len(payload)) * BYTE_TIME
+
+        if addr == LCD_ADDRESS and len(payload) > 1:
+            self._lcd(payload)
+        elif addr == SN3193_ADDRESS:
+            reg = payload[0]
+            for value in payload[1:]:
+                if reg < len(self.led_regs):
+                    self.led_regs[reg] = value
+                reg += 1
+
+    # Walk the control bytes: Co=1 means one byte then another control byte,
+    # Co=0 means the rest of the transfer; RS picks command or data
+    def _lcd(self, payload):
+        # Each byte executes while the next one is on the wire, so only the
+        # last one, or a slow command, can hold up the next transfer
+        i = 0
+        exec_time = EXEC_TIME
+        while i < len(payload) - 1:
+            control = payload[i]
+            is_data = control & 0x40
+            if control & 0x80:
+                run = payload[i + 1:i + 2]
+                i += 2
+            else:
+                run = payload[i + 1:]
+                i = len(payload)
+            for value in run:
+                if is_data:
+                    self._data(value)
+                else:
+                    exec_time = max(exec_time, self._command(value))
+        self._busy_until = self.elapsed + exec_time
+
+    def _command(self, cmd):
+        if cmd & 0x80:  # Set DDRAM address
+            self.addr = cmd & 0x7f
+            self.in_cgram = False
+        elif cmd & 0x40:  # Set CGRAM address
+            self.addr = cmd & 0x3f
+            self.in_cgram = True
+        elif cmd & 0x20:  # Function set
+            self.function = cmd
+        elif cmd & 0x10:  # Cursor or display shift
+            if cmd & 0x08:
+                self.shift += -1 if cmd & 0x04 else 1
+                self.shift %= DDRAM_WIDTH
+        elif cmd & 0x08:  # Display control
+            self.display_on = bool(cmd & 0x04)
+            self.cursor_on = bool(cmd & 0x02)
+            self.blink_on = bool(cmd & 0x01)
+        elif cmd & 0x04:  # Entry mode
+            self.increment = bool(cmd & 0x02)
+            self.entry_shift = bool(cmd & 0x01)
+        elif cmd & 0x02:  # Return home
+            self.addr = 0
+            self.shift = 0
+            self.in_cgram = False
+            return SLOW_EXEC_TIME
+        elif cmd & 0x01:  # Clear display
+            for line in self.ddram:
+                line[:] = b' ' * DDRAM_WIDTH
+            self.addr = 0
+            self.shift = 0
+            self.in_cgram = False
+            self.increment = True
+            return SLOW_EXEC_TIME
+        return EXEC_TIME
+
+    def _data(self, value):
+        step = 1 if self.increment else -1
+        if self.in_cgram:
+            self.cgram[self.addr] = value
+            self.addr = (self.addr + step) % CGRAM_SIZE
+            return
+        row, col = divmod(self.addr, 0x40)
+        if row < 2 and col < DDRAM_WIDTH:
+            self.ddram[row][col] = value
+        col += step
+        if col >= DDRAM_WIDTH:
+            row, col = 1 - row, 0
+        elif col < 0:
+            row, col = 1 - row, DDRAM_WIDTH - 1
+        self.addr = (row & 1) * 0x40 + col
+        if self.entry_shift:
+            # Left when incrementing, right when decrementing
+            self.shift = (self.shift + step) % DDRAM_WIDTH
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# CGRAM slot manager for LCD1602 custom characters: any number of named
+# 5x8 glyphs share the 8 slots, uploaded only when not already resident
+from collections import OrderedDict
+from string import Formatter
+
+CGRAM_SLOTS = 8
+
+
+class GlyphManager:
+    def __init__(self, lcd, slots=CGRAM_SLOTS):
+        self.lcd = lcd
+        self._bitmaps = {}  # name -> 8 row bitmap
+        self._resident = OrderedDict()  # name -> slot, least recently used first
+        self._free = list(range(slots))
+        self._pinned = set()  # names used in the current frame
+
+        # Counters for checking how often CGRAM is rewritten
+        self.hits = 0
+        self.uploads = 0
+
+    # Register a named 5x8 bitmap; a changed bitmap is re-uploaded on next use
+    def register(self, name, bitmap):
+        bitmap = tuple(bitmap[:8])
+        if self._bitmaps.get(name) == bitmap:
+            return
+        self._bitmaps[name] = bitmap
+        slot = self._resident.pop(name, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    # Start a new frame; glyphs from the previous frame may now be evicted
+    def begin_frame(self):
+        self._pinned.clear()
+
+    # Return the characters for the named glyphs, uploading any that are not
+    # resident. They stay pinned until the next begin_frame()
+    def use(self, *names):
+        return ''.join(chr(self._slot(name)) for name in names)
+
+    # Format a template whose fields name glyphs, e.g. "{heart} HELLO {heart}"
+    def format(self, template, **kwargs):
+        for _, field, _, _ in Formatter().parse(template):
+            if field and field not in kwargs:
+                kwargs[field] = self.use(field)
+        return template.format(**kwargs)
+
+    # Names currently held in CGRAM, by slot
+    def resident(self):
+        return {slot: name for name, slot in self._resident.items()}
+
+    def _slot(self, name):
+        self._pinned.add(name)
+        slot = self._resident.get(name)
+        if slot is not None:
+            self._resident.move_to_end(name)
+            self.hits += 1
+            return slot
+
+        if name not in self._bitmaps:
+            raise KeyError(f"Unknown glyph: {name}")
+        if self._free:
+            slot = self._free.pop(0)
+        else:
+            slot = self._evict()
+        self.lcd.createChar(slot, self._bitmaps[name])
+        self._resident[name] = slot
+        self.uploads += 1
+        return slot
+
+    # Free the least recently used slot whose glyph is not in the current frame
+    def _evict(self):
+        for victim in self._resident:
+            if victim not in self._pinned:
+                return self._resident.pop(victim)
+        raise ValueError(f"More than {len(self._resident)} custom glyphs in one frame")
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Non-blocking front end for LCD1602: callers post frames and commands,
+# a worker thread applies them to the display
+import threading
+import time
+from collections import deque
+
+# Queue entry kinds
+FRAME = 0
+CALL = 1
+
+
+class LCDService:
+    def __init__(self, lcd, led=None, width=16):
+        self.lcd = lcd
+        self.led = led
+        self.width = width
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._idle = True
+
+        # Counters for checking how much work was coalesced away
+        self.posted = 0
+        self.drawn = 0
+        self.dropped = 0
+        self.errors = 0  # Jobs that raised; the worker carries on
+
+        self._worker = threading.Thread(target=self._run, name="lcd-service", daemon=True)
+        self._worker.start()
+
+    # Post a full frame, one string per row. A frame still waiting in the
+    # queue is replaced, so only the newest one is drawn
+    def show(self, *lines):
+        with self._cond:
+            self.posted += 1
+            if self._queue and self._queue[-1][0] == FRAME:
+                self._queue[-1] = (FRAME, lines)
+                self.dropped += 1
+            else:
+                self._queue.append((FRAME, lines))
+            self._cond.notify()
+
+    # Queue a driver call such as clear or createChar, kept in order with frames
+    def call(self, name, *args):
+        self._post((CALL, (self.lcd, name, args)))
+
+    # Queue a backlight call such as set_brightness
+    def backlight(self, name, *args):
+        self._post((CALL, (self.led, name, args)))
+
+    def _post(self, item):
+        with self._cond:
+            self._queue.append(item)
+            self._cond.notify()
+
+    # Block until everything queued so far has reached the display
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or not self._idle:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # Drain the queue and stop the worker
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._idle = True
+                    self._cond.notify_all()
+                    self._cond.wait()
+                if not self._queue:
+                    self._idle = True
+                    self._cond.notify_all()
+                    return
+                kind, payload = self._queue.popleft()
+                self._idle = False
+            try:
+                if kind == FRAME:
+                    self._draw(payload)
+                else:
+                    target, name, args = payload
+                    getattr(target, name)(*args)
+            except OSError as e:
+                self.errors += 1
+                print(f"LCD write failed: {e}")
+            except Exception as e:
+                # A bad job must not kill the worker, or wait() and close()
+                # would block on work that never finishes
+                self.errors += 1
+                job = "frame" if kind == FRAME else payload[1]
+                print(f"LCD service: {job} failed: {e!r}")
+
+    def _draw(self, lines):
+        self.lcd.clearFrame()
+        for row, text in enumerate(lines[:2]):
+            self.lcd.draw(0, row, str(text)[:self.width].ljust(self.width))
+        self.lcd.flush()
+        self.drawn += 1
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# I2C bus adapters for the LCD1602 and SN3193 drivers. A bus only needs
+#   write_byte_data(addr, reg, value)  one register/control byte and a value
+#   write_block(addr, reg, buf)        a register/control byte and a buffer
+#   write_byte(addr, value)            a single byte, e.g. an I2C mux select
+# and a name, which tells apart the warm-start state of panels on other buses
+import sys
+
+
+# The bus for this platform: machine.I2C on MicroPython, smbus on Linux
+# behind a BusManager so threads sharing the LCD and backlight take turns
+def default_bus():
+    if sys.implementation.name == 'micropython':
+        return MachineI2CAdapter()
+    from busmanager import BusManager
+    return BusManager(SMBusAdapter(1))
+
+
+# Linux /dev/i2c-N through smbus, opened on first use so the driver can be
+# imported on machines without the hardware
+class SMBusAdapter:
+    def __init__(self, bus=1):
+        self.bus_number = bus
+        self.name = 'i2c-%d' % bus
+        self._bus = None
+
+        # Traffic counters, bytes include the register/control byte
+        self.transactions = 0
+        self.bytes = 0
+
+    def _open(self):
+        if self._bus is None:
+            from smbus import SMBus
+            self._bus = SMBus(self.bus_number)
+        return self._bus
+
+    def write_byte_data(self, addr, reg, value):
+        self.transactions += 1
+        self.bytes += 2
+        self._open().write_byte_data(addr, reg, value)
+
+    def write_block(self, addr, reg, buf):
+        self.transactions += 1
+        self.bytes += 1 + len(buf)
+        self._open().write_i2c_block_data(addr, reg, list(buf))
+
+    def write_byte(self, addr, value):
+        self.transactions += 1
+        self.bytes += 1
+        self._open().write_byte(addr, value)
+
+    def close(self):
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
+
+
+# MicroPython machine.I2C, defaulting to the Pico/ESP32 wiring (SDA GP4,
+# SCL GP5). Buffers are passed straight through and single bytes go through
+# a preallocated buffer, so writes allocate nothing and never trigger GC
+class MachineI2CAdapter:
+    def __init__(self, id=0, sda=4, scl=5, freq=400000):
+        self.id = id
+        self.sda = sda
+        self.scl = scl
+        self.freq = freq
+        self.name = 'i2c%d' % id
+        self._i2c = None
+        self._byte = bytearray(1)
+
+        self.transactions = 0
+        self.bytes = 0
+
+    def _open(self):
+        if self._i2c is None:
+            from machine import I2C, Pin
+            self._i2c = I2C(self.id, sda=Pin(self.sda), scl=Pin(self.scl), freq=self.freq)
+        return self._i2c
+
+    def write_byte_data(self, addr, reg, value):
+        self.transactions += 1
+        self.bytes += 2
+        self._byte[0] = value
+        self._open().writeto_mem(addr, reg, self._byte)
+
+    def write_block(self, addr, reg, buf):
+        self.transactions += 1
+        self.bytes += 1 + len(buf)
+        self._open().writeto_mem(addr, reg, buf)
+
+    def write_byte(self, addr, value):
+        self.transactions += 1
+        self.bytes += 1
+        self._byte[0] = value
+        self._open().writeto(addr, self._byte)
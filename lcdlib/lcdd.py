@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+# Display daemon: owns the LCD1602 and SN3193 so several programs can share
+# the panel. Clients connect over a Unix socket and send JSON lines. Each
+# client draws into its own layer, layers are stacked by priority, clients
+# of equal priority take turns, and only the cells that change reach the bus.
+#
+#   python3 lcdd.py                           run the daemon
+#   python3 lcdd.py --show "Hello" "there"    post a frame from the shell
+#
+#   import lcdd
+#   with lcdd.Client("clock", priority=1) as display:
+#       display.draw(11, 1, "12:00")
+#
+# Messages, one JSON object per line:
+#   {"op": "hello", "name": "clock", "priority": 1}
+#   {"op": "show", "lines": ["row 0", "row 1"]}  replace the whole layer
+#   {"op": "draw", "col": 11, "row": 1, "text": "12:00"}
+#   {"op": "clear"}  hand every cell back to the layers below
+#   {"op": "backlight", "level": 50}  0-100, null to stop asking
+import argparse
+import json
+import os
+import selectors
+import socket
+import time
+
+import charmap
+
+SOCKET_PATH = '/tmp/lcdd.sock'
+SOCKET_MODE = 0o660  # Owner and group may draw; add users to the daemon's group
+SLICE = 5.0  # Seconds each client of equal priority holds the display
+WIDTH = 16
+ROWS = 2
+MAX_PENDING = 65536  # Bytes of unfinished message before a client is dropped
+
+
+# === Client side ===
+
+class Client:
+    def __init__(self, name, priority=0, path=SOCKET_PATH):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self._send(op='hello', name=name, priority=priority)
+
+    def show(self, *lines):
+        self._send(op='show', lines=[str(line) for line in lines])
+
+    def draw(self, col, row, text):
+        self._send(op='draw', col=col, row=row, text=str(text))
+
+    def clear(self):
+        self._send(op='clear')
+
+    def backlight(self, level):
+        self._send(op='backlight', level=level)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, **msg):
+        self.sock.sendall((json.dumps(msg, separators=(',', ':')) + '\n').encode())
+
+
+# A Client, or None if no daemon is running, for scripts that fall back to
+# driving the panel themselves
+def connect(name, priority=0, path=SOCKET_PATH):
+    try:
+        return Client(name, priority, path)
+    except OSError:
+        return None
+
+
+# === Daemon side ===
+
+# What one client has drawn. mask marks the cells it owns; the rest show
+# through from the layers below
+class Layer:
+    def __init__(self, order):
+        self.order = order  # Connection order, sets the turn order
+        self.name = '?'
+        self.priority = 0
+        self.level = None  # Backlight level asked for
+        self.cells = [bytearray(b' ' * WIDTH) for _ in range(ROWS)]
+        self.mask = [bytearray(WIDTH) for _ in range(ROWS)]
+        self.pending = b''  # Start of a message still arriving
+
+    def show(self, lines):
+        for row in range(ROWS):
+            text = lines[row] if row < len(lines) else ''
+            self.cells[row][:] = charmap.ROM.encode(str(text))[:WIDTH].ljust(WIDTH)
+            self.mask[row][:] = b'\x01' * WIDTH
+
+    def draw(self, col, row, text):
+        if not (0 <= row < ROWS and 0 <= col < WIDTH):
+            return
+        buf = charmap.ROM.encode(str(text))[:WIDTH - col]
+        self.cells[row][col:col + len(buf)] = buf
+        self.mask[row][col:col + len(buf)] = b'\x01' * len(buf)
+
+    def clear(self):
+        for mask in self.mask:
+            mask[:] = bytes(WIDTH)
+
+    def visible(self):
+        return any(any(mask) for mask in self.mask)
+
+
+class Daemon:
+    def __init__(self, lcd, led=None, path=SOCKET_PATH, mode=SOCKET_MODE):
+        self.lcd = lcd
+        self.led = led
+        self.path = path
+        self.layers = {}  # socket -> Layer
+
+        # Counters: messages handled and compositions that reached the panel
+        self.messages = 0
+        self.frames = 0
+
+        self._screen = [bytearray(b' ' * WIDTH) for _ in range(ROWS)]
+        self._level = None
+        self._order = 0
+        self._turn = 0
+        self._next_turn = time.monotonic() + SLICE
+
+        self._selector = selectors.DefaultSelector()
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Bind with no access for others, so the socket is never open to
+        # them, then set the mode exactly whatever the umask was
+        umask = os.umask(0o777 & ~mode)
+        try:
+            self._server.bind(path)
+        finally:
+            os.umask(umask)
+        os.chmod(path, mode)
+        self._server.listen()
+        self._server.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ)
+
+    # Handle clients until interrupted. Everything that arrives in one wake
+    # is composed once, so bursts of updates cost one flush
+    def serve(self):
+        while True:
+            stack, contested = self._stack()
+            now = time.monotonic()
+            if not contested:
+                self._next_turn = now + SLICE
+            timeout = max(0.0, self._next_turn - now) if contested else None
+
+            changed = False
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._server:
+                    self._accept()
+                else:
+                    changed |= self._read(key.fileobj)
+
+            if contested and time.monotonic() >= self._next_turn:
+                self._turn += 1
+                self._next_turn = time.monotonic() + SLICE
+                changed = True
+            if changed:
+                self._compose()
+
+    def close(self):
+        for sock in list(self.layers):
+            self._drop(sock)
+        self._selector.unregister(self._server)
+        self._server.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _accept(self):
+        try:
+            sock, _ = self._server.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        self._order += 1
+        self.layers[sock] = Layer(self._order)
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def _drop(self, sock):
+        self._selector.unregister(sock)
+        sock.close()
+        del self.layers[sock]
+
+    # Read what a client sent; True if the display may need redrawing
+    def _read(self, sock):
+        layer = self.layers[sock]
+        try:
+            data = sock.recv(4096)
+        except OSError:
+            data = b''
+        if not data:
+            self._drop(sock)
+            return True
+        *lines, layer.pending = (layer.pending + data).split(b'\n')
+        if len(layer.pending) > MAX_PENDING:
+            print(f"lcdd: dropping {layer.name}, message too long")
+            self._drop(sock)
+            return True
+        for line in lines:
+            try:
+                self._handle(layer, json.loads(line))
+            except (ValueError, TypeError, KeyError, AttributeError):
+                print(f"lcdd: bad message from {layer.name}: {line[:60]!r}")
+        return bool(lines)
+
+    def _handle(self, layer, msg):
+        self.messages += 1
+        op = msg['op']
+        if op == 'hello':
+            layer.name = str(msg.get('name', '?'))
+            layer.priority = int(msg.get('priority', 0))
+        elif op == 'show':
+            layer.show(msg['lines'])
+        elif op == 'draw':
+            layer.draw(int(msg['col']), int(msg['row']), msg['text'])
+        elif op == 'clear':
+            layer.clear()
+        elif op == 'backlight':
+            level = msg['level']
+            layer.level = None if level is None else max(0, min(100, int(level)))
+        else:
+            raise ValueError(op)
+
+    # Layers bottom to top. Within a priority the client whose turn it is
+    # goes on top; contested is True when some priority has more than one
+    def _stack(self):
+        groups = {}
+        for layer in self.layers.values():
+            if layer.visible() or layer.level is not None:
+                groups.setdefault(layer.priority, []).append(layer)
+        stack = []
+        contested = False
+        for priority in sorted(groups):
+            group = sorted(groups[priority], key=lambda layer: layer.order)
+            holder = group.pop(self._turn % len(group))
+            stack += group + [holder]
+            contested |= bool(group)
+        return stack, contested
+
+    def _compose(self):
+        stack, _ = self._stack()
+        level = None
+        for line in self._screen:
+            line[:] = b' ' * WIDTH
+        for layer in stack:
+            for row in range(ROWS):
+                cells, mask, line = layer.cells[row], layer.mask[row], self._screen[row]
+                for col in range(WIDTH):
+                    if mask[col]:
+                        line[col] = cells[col]
+            if layer.level is not None:
+                level = layer.level
+
+        for row in range(ROWS):
+            self.lcd.draw(0, row, self._screen[row])
+        self.lcd.flush()  # Sends only the cells that changed
+        self.frames += 1
+
+        if self.led is not None and level is not None and level != self._level:
+            self.led.set_brightness(level)
+            self._level = level
+
+
+# True if a daemon is already listening on path
+def _running(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LCD1602 display daemon")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--show", nargs="+", metavar="LINE",
+                        help="post a frame to a running daemon and wait")
+    parser.add_argument("--priority", type=int, default=0, help="priority for --show")
+    args = parser.parse_args()
+
+    if args.show:
+        with Client("shell", args.priority, args.socket) as display:
+            display.show(*args.show)
+            print("Showing, Ctrl+C to release the display")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+        return
+
+    if _running(args.socket):
+        print(f"lcdd is already running on {args.socket}")
+        return
+    if os.path.exists(args.socket):
+        os.remove(args.socket)  # Left over from a daemon that crashed
+
+    import LCD1602
+    lcd = LCD1602.LCD1602(16, 2, warm=True)
+    led = LCD1602.SN3193(warm=True)
+    daemon = Daemon(lcd, led, args.socket)
+    print(f"lcdd listening on {args.socket}")
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        lcd.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Warm-start state for the LCD1602 and SN3193 drivers. Neither chip can be
+# read back, so the last known configuration is kept in tmpfs and tagged
+# with the boot id. A state file is removed when it is loaded and written
+# again on a clean exit, so a crash or reboot always leads to a cold init
+import json
+import os
+
+STATE_DIR = '/dev/shm'
+
+
+def _boot_id():
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _path(name):
+    return STATE_DIR + '/' + name + '.json'
+
+
+# Load and remove a saved state; None if missing, unreadable or from
+# another boot
+def take(name):
+    path = _path(name)
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        os.remove(path)
+    except (OSError, ValueError):
+        return None
+    boot = _boot_id()
+    if boot is None or state.get('boot') != boot:
+        return None
+    return state
+
+
+# Remove a saved state, after a cold init has made it stale
+def discard(name):
+    try:
+        os.remove(_path(name))
+    except OSError:
+        pass
+
+
+# Save a state, replacing the old file in one step
+def save(name, state):
+    boot = _boot_id()
+    if boot is None:
+        return
+    state = dict(state, boot=boot)
+    path = _path(name)
+    try:
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        print(f"Could not save display state: {e}")
+
+
+# Run fn at interpreter exit, where that is supported
+def on_exit(fn):
+    try:
+        import atexit
+    except ImportError:
+        return
+    atexit.register(fn)
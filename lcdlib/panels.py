@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Several LCD1602 panels at once. Every LCD1602 module answers at the same
+# address, so more than one panel needs a bus each or an I2C mux such as
+# the TCA9548A. PanelGroup updates panels on different buses in parallel
+# worker threads, so a wall of displays refreshes in about the time of the
+# slowest bus; panels sharing a bus, mux channels included, take turns.
+#
+#   mux = Mux(BusManager(SMBusAdapter(1)))
+#   group = PanelGroup([LCD1602.LCD1602(16, 2, bus=BusManager(SMBusAdapter(3))),
+#                       LCD1602.LCD1602(16, 2, bus=mux.channel(0)),
+#                       LCD1602.LCD1602(16, 2, bus=mux.channel(1))])
+#   group.show([("CPU", "41.2C"), ("RAM", "38%"), ("Disk", "71%")])
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import LCD1602
+
+MUX_ADDRESS = 0x70  # TCA9548A with A0-A2 low
+
+
+class Mux:
+    def __init__(self, bus=None, address=MUX_ADDRESS):
+        self.bus = bus if bus is not None else LCD1602.I2C
+        self.address = address
+        self.current = None  # Channel selected now, None when unknown
+        self.selects = 0  # Channel switches sent
+        self._lock = threading.Lock()
+
+    # A bus for the devices behind one channel (0-7)
+    def channel(self, channel):
+        return MuxChannel(self, channel)
+
+    # Selecting a channel and writing must not be split, so hold the bus if
+    # it is a BusManager, else a lock of our own
+    def _guard(self):
+        hold = getattr(self.bus, 'hold', None)
+        return hold() if hold is not None else self._lock
+
+    def _select(self, channel):
+        if self.current != channel:
+            self.bus.write_byte(self.address, 1 << channel)
+            self.current = channel
+            self.selects += 1
+
+
+# Same interface as the lcdbus adapters; each write first switches the mux
+# to this channel if another one is selected
+class MuxChannel:
+    def __init__(self, mux, channel):
+        self.mux = mux
+        self.channel = channel
+        self.upstream = mux.bus  # The bus the traffic really goes over
+        self.name = '%s-mux%02x.%d' % (getattr(mux.bus, 'name', 'bus'), mux.address, channel)
+
+    @property
+    def transactions(self):
+        return self.upstream.transactions
+
+    @property
+    def bytes(self):
+        return self.upstream.bytes
+
+    def write_byte_data(self, addr, reg, value):
+        with self.mux._guard():
+            self.mux._select(self.channel)
+            self.upstream.write_byte_data(addr, reg, value)
+
+    def write_block(self, addr, reg, buf):
+        with self.mux._guard():
+            self.mux._select(self.channel)
+            self.upstream.write_block(addr, reg, buf)
+
+    def write_byte(self, addr, value):
+        with self.mux._guard():
+            self.mux._select(self.channel)
+            self.upstream.write_byte(addr, value)
+
+
+# The physical bus a panel's writes go over
+def _root(bus):
+    if bus is None:
+        bus = LCD1602.I2C
+    while hasattr(bus, 'upstream'):
+        bus = bus.upstream
+    return bus
+
+
+class PanelGroup:
+    def __init__(self, panels, width=16):
+        self.panels = list(panels)
+        self.width = width
+
+        # One lane per physical bus; a lane's panels are updated in turn
+        lanes = {}
+        for panel in self.panels:
+            lanes.setdefault(id(_root(panel.bus)), []).append(panel)
+        self.lanes = list(lanes.values())
+        self._pool = ThreadPoolExecutor(max_workers=len(self.lanes), thread_name_prefix="panels")
+
+    # Show one frame per panel, in panel order: a sequence of row strings, or
+    # None to leave that panel as it is. Returns once every panel is drawn
+    def show(self, frames):
+        frames = dict(zip(map(id, self.panels), frames))
+
+        def draw(panel):
+            lines = frames.get(id(panel))
+            if lines is None:
+                return
+            panel.clearFrame()
+            for row, text in enumerate(lines[:2]):
+                panel.draw(0, row, str(text)[:self.width])
+            panel.flush()  # Only the cells that changed
+
+        self.each(draw)
+
+    # Call fn(panel) for every panel, lanes in parallel; results in panel
+    # order. An exception in any lane is raised here
+    def each(self, fn):
+        results = {}
+
+        def lane(panels):
+            for panel in panels:
+                results[id(panel)] = fn(panel)
+
+        for future in [self._pool.submit(lane, panels) for panels in self.lanes]:
+            future.result()
+        return [results[id(panel)] for panel in self.panels]
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
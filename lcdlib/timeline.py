@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Frame scheduler for LCD animations: frames run at absolute deadlines so bus
+# latency does not accumulate into drift, and missed frames are skipped
+import time
+
+
+class Timeline:
+    # interval: seconds between frames
+    # align: put deadlines on whole multiples of interval of the wall clock,
+    #        e.g. interval=1 wakes exactly once as each second begins
+    def __init__(self, interval, align=False):
+        self.interval = interval
+        self.align = align
+        # Aligned deadlines follow the wall clock the display is showing,
+        # everything else runs on the monotonic clock
+        self.clock = time.time if align else time.monotonic
+        self.skipped = 0  # Frames dropped because we were running behind
+        self._next = None  # Next deadline, None until the first frame
+
+    # Sleep until the next deadline; returns how many frame periods passed,
+    # which is more than 1 when frames were skipped
+    def wait(self):
+        now = self.clock()
+        if self._next is None:
+            self._next = now  # The first frame runs immediately
+        while now < self._next:
+            time.sleep(self._next - now)
+            now = self.clock()
+
+        missed = int((now - self._next) // self.interval)
+        self.skipped += missed
+        if self.align:
+            self._next = (now // self.interval + 1) * self.interval
+        else:
+            self._next += (missed + 1) * self.interval
+        return missed + 1
+
+    # Yield frame numbers at their deadlines, jumping ahead past skipped
+    # frames. With a count the last frame is always yielded
+    def frames(self, count=None):
+        frame = -1
+        while count is None or frame < count - 1:
+            frame += self.wait()
+            if count is not None:
+                frame = min(frame, count - 1)
+            yield frame
+
+    # Call callback(frame) for each frame until it returns False
+    def run(self, callback, count=None):
+        for frame in self.frames(count):
+            if callback(frame) is False:
+                break
+
+    # Restart timing from the next call to wait()
+    def reset(self):
+        self._next = None
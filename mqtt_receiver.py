@@ -3,6 +3,8 @@
 import paho.mqtt.client as mqtt
 import RPi.GPIO as GPIO
 import time
+import telemetry  # Binary messages, or the old plain-text temperature
+from mqtt_router import Router  # Handlers run off the network thread
 
 # Define GPIO Pins for LEDs
 GREEN_LED = 17  # Safe (Below 50°C)
@@ -25,11 +27,18 @@ def reset_leds():
     GPIO.output(YELLOW_LED, GPIO.LOW)
     GPIO.output(RED_LED, GPIO.LOW)
 
-# Callback function when message is received
-def on_message(client, userdata, message):
+# Handler for temperature messages; runs on the router's worker thread
+def show_temperature(topic, payload):
     try:
-        temp = float(message.payload.decode())
+        msg = telemetry.decode(payload, default='cpu_temp')
+        temp = msg['cpu_temp']
         print(f"CPU Temperature from Pi 5: {temp:.2f}°C")
+        peak = msg.get('cpu_temp_max')
+        if peak is not None:
+            print(f"Peak in the last {msg['samples']:.0f} readings: {peak:.2f}°C")
+        tracker.update(msg)
+        if tracker.lost:
+            print(f"Messages lost so far: {tracker.lost}")
 
         reset_leds()  # Turn off all LEDs
 
@@ -43,19 +52,23 @@ def on_message(client, userdata, message):
             GPIO.output(RED_LED, GPIO.HIGH)  # Red LED for Hot
             print("Status: Hot (Red LED ON)")
 
-    except ValueError:
+    except (ValueError, KeyError):
         print("Invalid temperature received.")
 
+# Counts messages lost on the way, from the sequence numbers
+tracker = telemetry.Tracker()
+
 # Create MQTT Client
 client = mqtt.Client()
-client.on_message = on_message
+
+# Subscribes on connect and hands messages to show_temperature
+router = Router(client)
+router.route(TOPIC, show_temperature)
+router.start()
 
 # Connect to the broker
 client.connect(BROKER_IP, 1883, 60)
 
-# Subscribe to the temperature topic
-client.subscribe(TOPIC)
-
 print("MQTT Subscriber Connected! Listening for CPU temperature updates...")
 
 # Cleanup GPIO on exit
@@ -64,4 +77,6 @@ try:
 except KeyboardInterrupt:
     print("Stopping...")
 finally:
+    router.stop()  # Let the handler finish before the pins are reset
+    print(router.report())
     GPIO.cleanup()  # Turns off LEDs and resets GPIO
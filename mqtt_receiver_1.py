@@ -1,5 +1,7 @@
 import paho.mqtt.client as mqtt
 import RPi.GPIO as GPIO
+import telemetry  # Binary messages, or the old plain-text temperature
+from mqtt_router import Router  # Handlers run off the network thread
 
 # Define GPIO pins for LEDs
 GREEN_LED = 17
@@ -17,32 +19,36 @@ GPIO.output(GREEN_LED, False)
 GPIO.output(YELLOW_LED, False)
 GPIO.output(RED_LED, False)
 
-# Callback function when a message is received
-def on_message(client, userdata, message):
+# Handler for temperature messages; runs on the router's worker thread
+def on_temperature(topic, payload):
     try:
-        cpu_temp = float(message.payload.decode())
-        print(f"Received: CPU Temp {cpu_temp}°C")
+        msg = telemetry.decode(payload, default='cpu_temp')
+        cpu_temp = msg['cpu_temp']
+        print(f"Received: CPU Temp {cpu_temp:.1f}°C, load {msg.get('load1', 0):.2f}")
 
         # LED Logic
         GPIO.output(GREEN_LED, cpu_temp < 50)   # Green LED ON if temp < 50°C
         GPIO.output(YELLOW_LED, 50 <= cpu_temp < 70)  # Yellow LED ON if 50°C ≤ temp < 70°C
         GPIO.output(RED_LED, cpu_temp >= 70)    # Red LED ON if temp ≥ 70°C
 
-    except ValueError:
+    except (ValueError, KeyError):
         print("Received invalid data.")
 
 # MQTT Setup
 client = mqtt.Client("PiZero2W_Receiver")
-client.on_message = on_message
+router = Router(client)
+router.route("pi5/cpu_temp", on_temperature)
+router.start()
 
 try:
     client.connect("10.0.0.229")  # Replace with Pi 5's IP
-    client.subscribe("pi5/cpu_temp")
     print("Connected to MQTT Broker. Listening for temperature updates...")
     
     client.loop_forever()  # Keep listening
 except Exception as e:
     print(f"MQTT Connection Error: {e}")
 finally:
+    router.stop()  # Let the handler finish before the pins are reset
+    print(router.report())
     print("Cleaning up GPIO...")
     GPIO.cleanup()  # Ensures GPIO pins are reset
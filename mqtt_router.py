@@ -0,0 +1,214 @@
+# Routes MQTT messages to handlers by topic filter, running them on a worker
+# thread so a slow handler (GPIO, printing) never holds up the network loop.
+# The queue between the two is bounded: when handlers fall behind the oldest
+# messages are dropped, since the newest reading is the one that matters.
+#
+#   router = Router(client)
+#
+#   @router.route("pi5/+/temperature")
+#   def show(topic, payload):
+#       ...
+#
+#   router.start()                 # Subscribes on every (re)connect
+#   client.loop_forever()
+#   router.stop()
+#   print(router.report())         # Calls, drops and latency per handler
+#
+# python3 mqtt_router.py  measures messages per second through the router
+import threading
+import time
+from collections import deque
+
+from paho.mqtt.client import topic_matches_sub
+from sampler import Ring, summarize  # Latency percentiles
+
+MAX_QUEUE = 1000  # Messages waiting for handlers before the oldest go
+HISTORY = 1000  # Latest latencies kept per handler for the report
+CACHE_SIZE = 1024  # Topics whose handler list is remembered
+
+
+class HandlerStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.busy = 0.0  # Seconds spent in the handler
+        self.wait = Ring(HISTORY)  # Arrival to handler start, seconds
+        self.run = Ring(HISTORY)  # Time in the handler, seconds
+
+    def __repr__(self):
+        return f"HandlerStats({self.name}, calls={self.calls}, errors={self.errors})"
+
+
+class Route:
+    def __init__(self, pattern, handler, qos):
+        self.pattern = pattern
+        self.handler = handler
+        self.qos = qos
+        self.stats = HandlerStats(f"{getattr(handler, '__name__', 'handler')} <{pattern}>")
+
+
+class Router:
+    # maxsize: queue length before dropping the oldest message
+    def __init__(self, client, maxsize=MAX_QUEUE):
+        self.client = client
+        self.routes = []
+        self.queue = deque(maxlen=maxsize)
+
+        # Counters: messages received, dropped when the queue was full,
+        # received with no matching route; deepest the queue has been
+        self.received = 0
+        self.dropped = 0
+        self.unrouted = 0
+        self.max_depth = 0
+
+        self._cache = {}  # Topic: routes that match it
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Callbacks already set on the client still get called
+        self._on_connect = client.on_connect
+        client.on_connect = self._connected
+        client.on_message = self._message
+
+    # Add a handler(topic, payload) for a topic filter with + and #
+    # wildcards; usable as a decorator
+    def route(self, pattern, handler=None, qos=0):
+        if handler is None:
+            return lambda handler: self.route(pattern, handler, qos)
+        self.routes.append(Route(pattern, handler, qos))
+        self._cache.clear()
+        if self.client.is_connected():
+            self.client.subscribe(pattern, qos)
+        return handler
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._work, name="mqtt-router", daemon=True)
+        self._thread.start()
+
+    # Stop after the handlers finish what is queued
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # Table of calls, errors and latencies per handler, in milliseconds
+    def report(self):
+        lines = [f"Received {self.received}, dropped {self.dropped}, "
+                 f"unrouted {self.unrouted}, deepest queue {self.max_depth}"]
+        for route in self.routes:
+            stats = route.stats
+            line = f"{stats.name}: {stats.calls} calls, {stats.errors} errors"
+            for label, ring in (("wait", stats.wait), ("run", stats.run)):
+                summary = summarize(ring.last(ring.count))
+                if summary is not None:
+                    line += (f", {label} mean {summary.mean * 1e3:.2f} "
+                             f"p95 {summary.p95 * 1e3:.2f} max {summary.max * 1e3:.2f} ms")
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _connected(self, client, userdata, flags, rc, *args):
+        if rc == 0 and self.routes:
+            client.subscribe([(route.pattern, route.qos) for route in self.routes])
+        if self._on_connect is not None:
+            self._on_connect(client, userdata, flags, rc, *args)
+
+    # On the network thread: queue and return. A full deque drops its oldest
+    # item on append
+    def _message(self, client, userdata, message):
+        queue = self.queue
+        self.received += 1
+        depth = len(queue)
+        if depth == queue.maxlen:
+            self.dropped += 1
+        elif depth >= self.max_depth:
+            self.max_depth = depth + 1
+        queue.append((time.perf_counter(), message))
+        if not self._wake.is_set():
+            self._wake.set()
+
+    # Routes that match topic, remembered per topic
+    def _match(self, topic):
+        routes = self._cache.get(topic)
+        if routes is None:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            routes = self._cache[topic] = [route for route in self.routes
+                                           if topic_matches_sub(route.pattern, topic)]
+        return routes
+
+    def _work(self):
+        queue = self.queue
+        clock = time.perf_counter
+        while True:
+            try:
+                arrived, message = queue.popleft()
+            except IndexError:
+                if self._stop.is_set():
+                    return
+                # Clear, then check again: a message queued in between has
+                # either been seen here or set the event after the clear
+                self._wake.clear()
+                if not queue:
+                    self._wake.wait()
+                continue
+            topic = message.topic
+            routes = self._match(topic)
+            if not routes:
+                self.unrouted += 1
+                continue
+            payload = message.payload
+            for route in routes:
+                stats = route.stats
+                start = clock()
+                try:
+                    route.handler(topic, payload)
+                except Exception as e:
+                    stats.errors += 1
+                    print(f"Handler {stats.name} failed: {e!r}")
+                end = clock()
+                stats.calls += 1
+                stats.busy += end - start
+                stats.wait.append(start - arrived)
+                stats.run.append(end - start)
+
+
+if __name__ == "__main__":
+    import paho.mqtt.client as mqtt
+
+    COUNT = 200000
+
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    router = Router(client, maxsize=COUNT)
+    totals = {}
+
+    @router.route("pi5/+/temperature")
+    def temperature(topic, payload):
+        totals[topic] = totals.get(topic, 0) + 1
+
+    @router.route("pi5/#")
+    def everything(topic, payload):
+        pass
+
+    messages = []
+    for i in range(COUNT):
+        message = mqtt.MQTTMessage(topic=f"pi5/{'zero' if i % 2 else 'five'}/temperature".encode())
+        message.payload = b"48.31"
+        messages.append(message)
+
+    # Feed the router the way paho's network thread would
+    router.start()
+    start = time.perf_counter()
+    for message in messages:
+        router._message(client, None, message)
+    queued = time.perf_counter() - start
+    router.stop()
+    total = time.perf_counter() - start
+
+    print(f"Queueing: {COUNT / queued:,.0f} messages/s on the network thread")
+    print(f"Handled: {COUNT / total:,.0f} messages/s, two handlers each")
+    print(router.report())
@@ -1,38 +1,76 @@
+import os
 import paho.mqtt.client as mqtt
-import time
+import telemetry  # Binary messages with several metrics
+from sampler import Sampler  # Fast readings, one summary per window
+from sensors import Sensors  # Thermal zone kept open between readings
+from outbox import Outbox, Forwarder  # Keeps messages while the broker is away
 
 # Define MQTT Broker (Raspberry Pi 5's IP)
 BROKER_IP = "10.0.0.229"  # Change to your Pi 5's local IP
 TOPIC = "pi5/temperature"
+SEND_TEXT = False  # True for receivers that only understand "48.31"
+RATE = 10  # Temperature readings per second
+WINDOW = 5  # Seconds summarized in each message
+OUTBOX = "/var/tmp/mqtt_sender.outbox"  # Messages not yet sent, kept across restarts
+
+sensors = Sensors()
 
 # Function to get CPU temperature
 def get_cpu_temp():
+    temp = sensors.temperature()
+    if temp is None:
+        print("Error reading temperature")
+    return temp
+
+# Function to get the share of RAM in use, in percent
+def get_ram_percent():
     try:
-        with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-            temp = int(f.read()) / 1000.0  # Convert to Celsius
-        return temp
-    except Exception as e:
-        print(f"Error reading temperature: {e}")
+        info = {}
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = int(value.split()[0])
+        return 100.0 * (1 - info["MemAvailable"] / info["MemTotal"])
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error reading RAM usage: {e}")
         return None
 
 # Create MQTT Client
 client = mqtt.Client()
 
-# Connect to the broker
-client.connect(BROKER_IP, 1883, 60)
+# Connects in the background, reconnects when the broker goes away and
+# sends what was queued meanwhile
+forwarder = Forwarder(client, Outbox(OUTBOX), BROKER_IP, 1883, 60)
+forwarder.start()
+
+# Numbers and packs each message
+publisher = telemetry.Publisher(forwarder, TOPIC, telemetry.WINDOW)
+
+# Reads the temperature RATE times a second
+sampler = Sampler(get_cpu_temp, rate=RATE, window=WINDOW)
+
+# Send one message per window: mean, min, max and p95 of the readings
+def publish_window(stats):
+    if stats is None:
+        print("Failed to get CPU temperature")
+    elif SEND_TEXT:
+        message = f"{stats.mean:.2f}"
+        forwarder.publish(TOPIC, message)
+        print(f"Published: {message}°C")
+    else:
+        ram = get_ram_percent()
+        load1, load5, load15 = os.getloadavg()
+        publisher.publish(cpu_temp=stats.mean, cpu_temp_min=stats.min,
+                          cpu_temp_max=stats.max, cpu_temp_p95=stats.p95,
+                          samples=stats.count, ram_percent=ram,
+                          load1=load1, load5=load5, load15=load15)
+        print(f"Published #{publisher.seq - 1}: {stats.mean:.2f}°C "
+              f"(max {stats.max:.2f}, {stats.count} readings), load {load1:.2f}")
 
 print("MQTT Publisher Connected! Sending CPU temperature...")
 
 try:
-    while True:
-        temp = get_cpu_temp()
-        if temp is not None:
-            message = f"{temp:.2f}"
-            client.publish(TOPIC, message)
-            print(f"Published: {message}°C")
-        else:
-            print("Failed to get CPU temperature")
-        time.sleep(5)  # Send temperature every 5 seconds
+    sampler.run(publish_window)
 except KeyboardInterrupt:
     print("Stopping Publisher...")
-    client.disconnect()
+    forwarder.stop()
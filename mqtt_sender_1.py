@@ -1,10 +1,15 @@
 import os
 import time
 import paho.mqtt.client as mqtt
+import telemetry  # Binary messages with several metrics
+from sensors import Sensors  # No process per reading
+from outbox import Outbox, Forwarder  # Keeps messages while the broker is away
 
 # MQTT Broker IP (Change this to your Pi 5's actual IP)
 BROKER = "10.0.0.229"
 TOPIC = "pi5/cpu_temp"
+SEND_TEXT = False  # True for receivers that only understand "48.31"
+OUTBOX = "/var/tmp/mqtt_sender_1.outbox"  # Messages not yet sent, kept across restarts
 
 # MQTT Client Setup
 client = mqtt.Client("Pi5_Sender")
@@ -18,33 +23,36 @@ def on_connect(client, userdata, flags, rc):
 
 client.on_connect = on_connect
 
-# Attempt to connect to MQTT Broker
-try:
-    client.connect(BROKER)
-    client.loop_start()  # Start non-blocking MQTT loop
-except Exception as e:
-    print(f"Connection error: {e}")
-    exit(1)
+# Connects in the background and keeps retrying; readings wait in the
+# outbox until the broker takes them
+forwarder = Forwarder(client, Outbox(OUTBOX), BROKER)
+forwarder.start()
+
+# Numbers and packs each message
+publisher = telemetry.Publisher(forwarder, TOPIC, telemetry.SYSTEM)
+
+# Keeps the thermal zone open; vcgencmd only if there is nothing else
+sensors = Sensors()
 
 # Function to get CPU temperature
 def get_cpu_temp():
-    """Read CPU temperature efficiently using vcgencmd."""
-    try:
-        # Using 'r' for read is more efficient than popen
-        with os.popen("vcgencmd measure_temp") as temp_output:
-            temp = temp_output.readline()
-        return float(temp.replace("temp=", "").replace("'C\n", ""))
-    except (ValueError, AttributeError) as e:
-        print(f"Error reading temperature: {e}")
-        return None
+    """Read CPU temperature without spawning vcgencmd."""
+    temp = sensors.temperature()
+    if temp is None:
+        print("Error reading temperature")
+    return temp
 
 # Continuous publishing loop
 while True:
     cpu_temp = get_cpu_temp()
     if cpu_temp is not None:
         try:
-            client.publish(TOPIC, cpu_temp)
-            print(f"Sent: CPU Temp {cpu_temp}°C")
+            if SEND_TEXT:
+                forwarder.publish(TOPIC, cpu_temp)
+            else:
+                load1, load5, load15 = os.getloadavg()
+                publisher.publish(cpu_temp=cpu_temp, load1=load1, load5=load5, load15=load15)
+            print(f"Queued: CPU Temp {cpu_temp}°C ({len(forwarder.outbox)} waiting)")
         except Exception as e:
             print(f"Failed to publish: {e}")
 
@@ -0,0 +1,368 @@
+# Store-and-forward for the MQTT senders. Every message goes into a file
+# first; a background thread sends it once the broker acknowledges the
+# connection and removes it once the broker acknowledges the message. While
+# the broker is away messages pile up in the file (oldest dropped past
+# max_bytes), the thread reconnects with growing delays, and the backlog goes
+# out in batches at a fixed rate when the link is back.
+#
+#   forwarder = Forwarder(client, Outbox("/var/tmp/pi5.outbox"), BROKER)
+#   forwarder.start()
+#   forwarder.publish(TOPIC, payload)   # Same arguments as client.publish
+#   forwarder.stop()
+#
+# The file holds an 8-byte read offset followed by the records:
+#
+#   crc32  flags  topic length  payload length  topic  payload
+#   uint32 uint8  uint16        uint16          bytes  bytes, little-endian
+#
+# Records are only ever appended; sending one moves the offset past it.
+# The file is rewritten only to drop what has been sent when it gets full.
+#
+# python3 outbox.py runs a demo against the fake broker in fakebroker.py
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+OFFSET = struct.Struct('<Q')
+RECORD = struct.Struct('<IBHH')
+START = OFFSET.size  # Where the first record goes
+MAX_BYTES = 1 << 20  # Room for about 18000 telemetry messages
+RETAIN = 0x04  # Flag bit; qos is in the low two bits
+
+RATE = 20.0  # Backlog messages sent per second
+BATCH = 10  # Messages sent before waiting for their acknowledgements
+MIN_DELAY = 1.0  # Seconds before the first reconnect attempt
+MAX_DELAY = 60.0  # Longest wait between attempts
+ACK_TIMEOUT = 10.0  # Seconds to wait for a batch to be acknowledged
+
+
+# paho accepts these payload types and turns numbers into text
+def _payload_bytes(payload):
+    if payload is None:
+        return b''
+    if isinstance(payload, str):
+        return payload.encode()
+    if isinstance(payload, (int, float)):
+        return str(payload).encode()
+    return bytes(payload)
+
+
+class Outbox:
+    # sync: fsync after every message, so it survives a power cut and not
+    #       only the process dying; costs an SD card write per message
+    def __init__(self, path, max_bytes=MAX_BYTES, sync=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.sync = sync
+        self.dropped = 0  # Messages thrown away because the file was full
+        self.removed = 0  # Messages sent or dropped since the file was opened
+        self._lock = threading.Lock()
+        self._pending = deque()  # (position, size) of each unsent record
+        self.fd = None
+        self._open()
+
+    def __len__(self):
+        return len(self._pending)
+
+    # Bytes used by the file
+    def size(self):
+        return self._end
+
+    def put(self, topic, payload=None, qos=0, retain=False):
+        topic = topic.encode()
+        payload = _payload_bytes(payload)
+        flags = (qos & 3) | (RETAIN if retain else 0)
+        header = RECORD.pack(0, flags, len(topic), len(payload))
+        crc = zlib.crc32(payload, zlib.crc32(topic, zlib.crc32(header[4:])))
+        record = RECORD.pack(crc, flags, len(topic), len(payload)) + topic + payload
+        with self._lock:
+            if self._end + len(record) > self.max_bytes:
+                self._compact(len(record))
+            os.pwrite(self.fd, record, self._end)
+            if self.sync:
+                os.fsync(self.fd)
+            self._pending.append((self._end, len(record)))
+            self._end += len(record)
+
+    # The first n unsent messages as (topic, payload, qos, retain), oldest
+    # first, and a ticket for commit(); they stay queued until then
+    def peek(self, n):
+        with self._lock:
+            if not self._pending:
+                return self.removed, []
+            n = min(n, len(self._pending))
+            first = self._pending[0][0]
+            last, size = self._pending[n - 1]
+            data = os.pread(self.fd, last + size - first, first)
+            messages = []
+            for pos, size in list(self._pending)[:n]:
+                _, flags, topic, payload = self._parse(data, pos - first)
+                messages.append((topic.decode(), payload, flags & 3, bool(flags & RETAIN)))
+            return self.removed + n, messages
+
+    # Forget the messages peek() returned with ticket, after they have been
+    # sent. Any of them dropped meanwhile to make room are already gone
+    def commit(self, ticket):
+        with self._lock:
+            n = min(ticket - self.removed, len(self._pending))
+            if n <= 0:
+                return
+            self.removed += n
+            for _ in range(n):
+                pos, size = self._pending.popleft()
+            if self._pending:
+                self._set_offset(pos + size)
+            else:
+                self._reset()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _open(self):
+        # Not O_APPEND: Linux ignores pwrite's offset on such files
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self.fd).st_size
+        if size < START:
+            os.ftruncate(self.fd, 0)
+            os.pwrite(self.fd, OFFSET.pack(START), 0)
+            self._end = START
+            return
+        offset = min(max(OFFSET.unpack(os.pread(self.fd, START, 0))[0], START), size)
+        data = os.pread(self.fd, size - offset, offset)
+        pos = 0
+        while pos < len(data):
+            record = self._parse(data, pos)
+            if record is None:
+                break  # Cut short by a crash; the rest is dropped
+            self._pending.append((offset + pos, record[0]))
+            pos += record[0]
+        self._end = offset + pos
+        if self._end < size:
+            os.ftruncate(self.fd, self._end)
+
+    # (size, flags, topic, payload) of the record at pos, or None if it is
+    # incomplete or damaged
+    def _parse(self, data, pos):
+        if pos + RECORD.size > len(data):
+            return None
+        crc, flags, topic_len, payload_len = RECORD.unpack_from(data, pos)
+        body = pos + RECORD.size
+        end = body + topic_len + payload_len
+        if end > len(data):
+            return None
+        view = memoryview(data)
+        if zlib.crc32(view[body:end], zlib.crc32(view[pos + 4:body])) != crc:
+            return None
+        topic = bytes(view[body:body + topic_len])
+        return end - pos, flags, topic, bytes(view[body + topic_len:end])
+
+    def _set_offset(self, offset):
+        os.pwrite(self.fd, OFFSET.pack(offset), 0)
+
+    # Everything sent: start the file over. Truncating first means a crash in
+    # between leaves an offset past the end, which reads as empty
+    def _reset(self):
+        os.ftruncate(self.fd, START)
+        self._set_offset(START)
+        self._end = START
+
+    # Make room for a record of size bytes: drop what has been sent, then the
+    # oldest messages if that is not enough, and write the rest to a new file
+    # that replaces this one in a single rename
+    def _compact(self, size):
+        room = self.max_bytes - START - size
+        used = sum(s for _, s in self._pending)
+        while self._pending and used > room:
+            used -= self._pending.popleft()[1]
+            self.dropped += 1
+            self.removed += 1
+        if self._pending:
+            first = self._pending[0][0]
+            data = os.pread(self.fd, self._end - first, first)
+        else:
+            data = b''
+        tmp = self.path + '.tmp'
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.pwrite(fd, OFFSET.pack(START) + data, 0)
+        os.fsync(fd)
+        os.replace(tmp, self.path)
+        os.close(self.fd)
+        self.fd = fd
+        shift = START - (self._pending[0][0] if self._pending else START)
+        self._pending = deque((pos + shift, s) for pos, s in self._pending)
+        self._end = START + len(data)
+
+
+# Sends an outbox through a paho client from its own thread. The client is
+# only used from that thread, so do not call loop_start() on it
+class Forwarder:
+    # qos: lowest qos used to send; 1 so the broker confirms each message
+    #      before it leaves the outbox
+    # rate: backlog messages per second; batch: messages per acknowledgement
+    def __init__(self, client, outbox, host, port=1883, keepalive=60, qos=1,
+                 rate=RATE, batch=BATCH, min_delay=MIN_DELAY, max_delay=MAX_DELAY,
+                 ack_timeout=ACK_TIMEOUT):
+        self.client = client
+        self.outbox = outbox
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.qos = qos
+        self.rate = rate
+        self.batch = batch
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.ack_timeout = ack_timeout
+        self.connected = False
+
+        # Counters: messages delivered, failed connection attempts
+        self.sent = 0
+        self.retries = 0
+
+        # Callbacks already set on the client still get called
+        self._on_connect = client.on_connect
+        self._on_disconnect = client.on_disconnect
+        client.on_connect = self._connected
+        client.on_disconnect = self._disconnected
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # Queue a message; takes the same arguments as client.publish
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.outbox.put(topic, payload, qos, retain)
+        self._wake.set()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mqtt-outbox", daemon=True)
+        self._thread.start()
+
+    # Stop sending; what is left stays in the outbox for next time
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.connected:
+            self.client.disconnect()
+            self.connected = False
+        self.outbox.close()
+
+    def _connected(self, client, userdata, flags, rc, *args):
+        self.connected = rc == 0
+        if self._on_connect is not None:
+            self._on_connect(client, userdata, flags, rc, *args)
+
+    def _disconnected(self, client, userdata, *args):
+        self.connected = False
+        if self._on_disconnect is not None:
+            self._on_disconnect(client, userdata, *args)
+
+    def _run(self):
+        delay = self.min_delay
+        while not self._stop.is_set():
+            if not self.connected:
+                if self._connect():
+                    delay = self.min_delay
+                else:
+                    self.retries += 1
+                    # Some jitter so several senders do not retry in step
+                    self._stop.wait(delay * random.uniform(0.75, 1.25))
+                    delay = min(delay * 2, self.max_delay)
+                continue
+            if not self._drain():
+                # Nothing queued: keep the connection alive until woken
+                self._wake.clear()
+                if not len(self.outbox):
+                    self._loop(min(1.0, self.keepalive / 2), self._wake.is_set)
+
+    # Connect and wait for the broker to accept; False if it did not
+    def _connect(self):
+        try:
+            self.client.connect(self.host, self.port, self.keepalive)
+        except (OSError, ValueError) as e:
+            print(f"Broker unreachable: {e}")
+            return False
+        self._loop(self.ack_timeout, lambda: self.connected)
+        if not self.connected:
+            self.client.disconnect()
+        return self.connected
+
+    # Run the client's network loop for up to timeout seconds, until done()
+    # or the connection drops
+    def _loop(self, timeout, done):
+        deadline = time.monotonic() + timeout
+        while not done() and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self.client.loop(timeout=min(remaining, 0.1)) != 0:
+                self.connected = False
+                return
+
+    # Send one batch and wait for the broker to take it; False if there was
+    # nothing to send or it did not arrive
+    def _drain(self):
+        ticket, messages = self.outbox.peek(self.batch)
+        if not messages:
+            return False
+        start = time.monotonic()
+        sent = [self.client.publish(topic, payload, max(qos, self.qos), retain)
+                for topic, payload, qos, retain in messages]
+        self._loop(self.ack_timeout, lambda: all(info.is_published() for info in sent))
+        if not all(info.is_published() for info in sent):
+            # No acknowledgement: assume the link is gone and send again
+            # after reconnecting, so the broker may see some twice
+            self.client.disconnect()
+            self.connected = False
+            return False
+        self.outbox.commit(ticket)
+        self.sent += len(messages)
+        # Hold the rate; the network loop keeps running meanwhile
+        self._loop(start + len(messages) / self.rate - time.monotonic(), lambda: False)
+        return True
+
+
+if __name__ == "__main__":
+    import tempfile
+    import paho.mqtt.client as mqtt
+    from fakebroker import FakeBroker
+
+    broker = FakeBroker()
+    broker.start()
+    path = os.path.join(tempfile.mkdtemp(), "demo.outbox")
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    forwarder = Forwarder(client, Outbox(path), "127.0.0.1", broker.port,
+                          rate=200, min_delay=0.2, max_delay=1.0)
+    forwarder.start()
+
+    for i in range(20):
+        forwarder.publish("demo/seq", str(i))
+    time.sleep(0.5)
+    print(f"Broker up: {len(broker.messages)} received, {len(forwarder.outbox)} queued")
+
+    broker.stop()
+    for i in range(20, 120):
+        forwarder.publish("demo/seq", str(i))
+    time.sleep(1.0)
+    print(f"Broker down: {len(broker.messages)} received, {len(forwarder.outbox)} queued, "
+          f"{forwarder.outbox.size()} bytes on disk")
+
+    broker.start()
+    start = time.monotonic()
+    while len(forwarder.outbox) and time.monotonic() - start < 10:
+        time.sleep(0.05)
+    seen = sorted(set(int(payload) for topic, payload, qos in broker.messages))
+    print(f"Broker back: backlog sent in {time.monotonic() - start:.2f} s, "
+          f"{len(seen)} distinct of 120 received, {forwarder.retries} retries")
+    forwarder.stop()
+    broker.stop()
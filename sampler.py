@@ -0,0 +1,125 @@
+# High-rate sampling with one summary per window. Readings go into a ring
+# buffer at a fixed rate; at the end of each window the buffer is reduced
+# to min, max, mean and p95, so a short spike shows up in the max without
+# sending every reading.
+#
+#   sampler = Sampler(get_cpu_temp, rate=10, window=5)
+#   sampler.run(lambda stats: print(stats.max, stats.p95))
+import math
+import time
+from array import array
+
+NAN = float('nan')
+
+
+# Fixed-size buffer of floats; the oldest reading is overwritten
+class Ring:
+    def __init__(self, size):
+        self.size = size
+        self.data = array('d', [NAN]) * size
+        self.count = 0  # Readings held, at most size
+        self._pos = 0  # Where the next reading goes
+
+    def append(self, value):
+        self.data[self._pos] = value
+        self._pos = (self._pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    # The last n readings, oldest first
+    def last(self, n):
+        n = min(n, self.count)
+        start = (self._pos - n) % self.size
+        if start + n <= self.size:
+            return self.data[start:start + n]
+        return self.data[start:] + self.data[:self._pos]
+
+
+class Stats:
+    __slots__ = ('min', 'max', 'mean', 'p95', 'count')
+
+    def __init__(self, low, high, mean, p95, count):
+        self.min = low
+        self.max = high
+        self.mean = mean
+        self.p95 = p95
+        self.count = count  # Readings in the window that were not NaN
+
+    def __repr__(self):
+        return (f"Stats(min={self.min:.2f}, max={self.max:.2f}, mean={self.mean:.2f}, "
+                f"p95={self.p95:.2f}, count={self.count})")
+
+
+# Summary of readings; failed readings (NaN) are left out. None if there
+# are none left
+def summarize(values):
+    values = sorted(v for v in values if v == v)
+    n = len(values)
+    if not n:
+        return None
+    p95 = values[max(0, math.ceil(0.95 * n) - 1)]  # Nearest rank
+    return Stats(values[0], values[-1], math.fsum(values) / n, p95, n)
+
+
+class Sampler:
+    # read: function returning a reading, None if it failed
+    # rate: readings per second; window: seconds summarized per callback
+    def __init__(self, read, rate=10.0, window=5.0):
+        self.read = read
+        self.interval = 1.0 / rate
+        self.per_window = max(1, round(window * rate))
+        self.ring = Ring(self.per_window)
+
+        # Counters: readings taken, readings that failed, readings skipped
+        # because the previous one ran late
+        self.samples = 0
+        self.failed = 0
+        self.skipped = 0
+
+    # Take one reading
+    def sample(self):
+        value = self.read()
+        if value is None:
+            value = NAN
+            self.failed += 1
+        self.ring.append(value)
+        self.samples += 1
+
+    # Summary of the last n readings, a whole window by default
+    def window(self, n=None):
+        return summarize(self.ring.last(self.per_window if n is None else n))
+
+    # Reading numbers at fixed deadlines on the monotonic clock, so the time
+    # a reading takes does not add up into drift. Deadlines already missed
+    # are skipped rather than caught up in a burst
+    def ticks(self):
+        interval = self.interval
+        deadline = time.monotonic()
+        tick = 0
+        while True:
+            now = time.monotonic()
+            if now < deadline:
+                time.sleep(deadline - now)
+                now = time.monotonic()
+            missed = int((now - deadline) // interval)
+            self.skipped += missed
+            tick += missed
+            yield tick
+            tick += 1
+            deadline += (missed + 1) * interval
+
+    # Sample forever, or for a number of windows, calling publish(stats) at
+    # the end of each. Readings skipped while running late still count
+    # towards the window, so windows stay the same length in time
+    def run(self, publish, windows=None):
+        taken = 0
+        done = 0
+        for tick in self.ticks():
+            self.sample()
+            taken += 1
+            if tick + 1 >= (done + 1) * self.per_window:
+                publish(self.window(taken))
+                done += 1
+                taken = 0
+                if windows is not None and done >= windows:
+                    return
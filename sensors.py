@@ -0,0 +1,283 @@
+# CPU temperature, throttling and ARM clock on a Raspberry Pi without
+# starting a process per reading. Each value comes from the cheapest source
+# that works, picked once:
+#
+#   sysfs     files kept open and re-read with os.pread, a few microseconds
+#   mailbox   the firmware property interface on /dev/vcio, one ioctl
+#   vcgencmd  a subprocess per reading, only when nothing else is there
+#
+#   sensors = Sensors()
+#   sensors.temperature()      # 48.3 (°C), or None
+#   sensors.throttled()        # 0x50000, or None
+#   sensors.arm_clock()        # 1500.0 (MHz), or None
+#   sensors.sources            # {'temperature': 'sysfs', ...}
+#
+# python3 sensors.py --bench  compares the cost of a reading per source
+import glob
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import time
+from array import array
+
+THERMAL_GLOB = "/sys/class/thermal/thermal_zone*"
+CPU_ZONE_TYPES = ("cpu-thermal", "cpu_thermal", "soc-thermal", "x86_pkg_temp")
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+CLOCK_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+VCIO_PATH = "/dev/vcio"
+
+# get_throttled bits; the same bits 16 higher mean "has happened since boot"
+THROTTLE_FLAGS = {
+    0: "under-voltage",
+    1: "frequency capped",
+    2: "throttled",
+    3: "soft temperature limit",
+}
+
+# Firmware property tags
+TAG_GET_TEMPERATURE = 0x00030006
+TAG_GET_MEASURED_CLOCK = 0x00030047
+TAG_GET_THROTTLED = 0x00030046
+CLOCK_ARM = 3
+MAILBOX_OK = 0x80000000
+# _IOWR(100, 0, char *): the argument is a pointer, so its size is in the code
+IOCTL_MBOX_PROPERTY = 0xC0006400 | (struct.calcsize("P") << 16)
+
+
+# Name of a flag set, e.g. ['throttled', 'under-voltage since boot']
+def describe_throttled(value):
+    found = []
+    for bit, name in THROTTLE_FLAGS.items():
+        if value & (1 << bit):
+            found.append(name)
+        elif value & (1 << (bit + 16)):
+            found.append(name + " since boot")
+    return found
+
+
+# === Sources ===
+
+# A sysfs attribute kept open; pread at offset 0 makes the kernel produce
+# a fresh value each time
+class SysfsValue:
+    def __init__(self, path, scale=1, base=10):
+        self.path = path
+        self.scale = scale
+        self.base = base
+        self.fd = os.open(path, os.O_RDONLY)
+        try:
+            self.read()  # Fail now rather than on first use
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def read(self):
+        return int(os.pread(self.fd, 32, 0), self.base) * self.scale
+
+    def close(self):
+        os.close(self.fd)
+
+
+# The VideoCore firmware's property mailbox. Each request is one ioctl on a
+# buffer that is allocated once per tag
+class Mailbox:
+    def __init__(self):
+        import fcntl
+        self._ioctl = fcntl.ioctl
+        self.fd = os.open(VCIO_PATH, os.O_RDWR)
+        self._buffers = {}
+
+    # Send a tag with request words; returns the response words
+    def request(self, tag, *words, answer=2):
+        size = max(len(words), answer)
+        buf = self._buffers.get((tag, size))
+        if buf is None:
+            buf = self._buffers[(tag, size)] = array("I", [0] * (size + 6))
+        buf[0] = len(buf) * 4
+        buf[1] = 0
+        buf[2] = tag
+        buf[3] = size * 4
+        buf[4] = 0
+        for i in range(size):
+            buf[5 + i] = words[i] if i < len(words) else 0
+        buf[5 + size] = 0  # End tag
+        self._ioctl(self.fd, IOCTL_MBOX_PROPERTY, buf, True)
+        if buf[1] != MAILBOX_OK:
+            raise OSError("Mailbox request 0x%08x failed" % tag)
+        return buf[5:5 + size]
+
+    def close(self):
+        os.close(self.fd)
+
+
+# Read functions, one per quantity and source. Each returns the value in
+# the module's units: °C, flag bits, MHz
+
+def _vcgencmd(*args):
+    return subprocess.run(["vcgencmd", *args], capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+def _vcgencmd_temperature():
+    return float(_vcgencmd("measure_temp").split("=")[1].rstrip("'C"))
+
+
+def _vcgencmd_throttled():
+    return int(_vcgencmd("get_throttled").split("=")[1], 16)
+
+
+def _vcgencmd_clock():
+    return int(_vcgencmd("measure_clock", "arm").split("=")[1]) / 1e6
+
+
+# The thermal zone of the CPU, else the first one there is
+def find_cpu_zone():
+    zones = sorted(glob.glob(THERMAL_GLOB))
+    for zone in zones:
+        try:
+            with open(zone + "/type") as f:
+                if f.read().strip() in CPU_ZONE_TYPES:
+                    return zone + "/temp"
+        except OSError:
+            continue
+    return zones[0] + "/temp" if zones else None
+
+
+class Sensors:
+    def __init__(self):
+        self._open = []  # Sources holding file descriptors
+        self._mailbox = None
+        self.sources = {}
+
+        zone = find_cpu_zone()
+        self._temperature = self._pick(
+            "temperature",
+            lambda: zone and SysfsValue(zone, scale=0.001).read,
+            lambda: self._mail(TAG_GET_TEMPERATURE, 0, scale=0.001),
+            lambda: _vcgencmd_temperature)
+        self._throttled = self._pick(
+            "throttled",
+            lambda: SysfsValue(THROTTLED_PATH, base=16).read,
+            lambda: self._mail(TAG_GET_THROTTLED, 0, index=0),
+            lambda: _vcgencmd_throttled)
+        self._clock = self._pick(
+            "arm_clock",
+            lambda: SysfsValue(CLOCK_PATH, scale=0.001).read,
+            lambda: self._mail(TAG_GET_MEASURED_CLOCK, CLOCK_ARM, scale=1e-6),
+            lambda: _vcgencmd_clock)
+
+    # °C, or None if it cannot be read
+    def temperature(self):
+        return self._read(self._temperature)
+
+    # get_throttled flag bits (see describe_throttled), or None
+    def throttled(self):
+        return self._read(self._throttled)
+
+    # ARM clock in MHz, or None
+    def arm_clock(self):
+        return self._read(self._clock)
+
+    def close(self):
+        for source in self._open:
+            source.close()
+        self._open.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self, read):
+        if read is None:
+            return None
+        try:
+            return read()
+        except (OSError, ValueError, IndexError, subprocess.SubprocessError):
+            return None
+
+    # The first source whose setup works and gives a reading
+    def _pick(self, name, sysfs, mailbox, vcgencmd):
+        for source, make in (("sysfs", sysfs), ("mailbox", mailbox), ("vcgencmd", vcgencmd)):
+            if source == "vcgencmd" and shutil.which("vcgencmd") is None:
+                continue
+            try:
+                read = make()
+                if read is None:
+                    continue
+                read()
+            except (OSError, ValueError, IndexError, ImportError, subprocess.SubprocessError):
+                continue
+            owner = getattr(read, "__self__", None)
+            if isinstance(owner, SysfsValue):
+                self._open.append(owner)
+            self.sources[name] = source
+            return read
+        self.sources[name] = None
+        return None
+
+    # A read function for a mailbox tag: index picks the response word
+    def _mail(self, tag, arg, index=1, scale=1):
+        if self._mailbox is None:
+            self._mailbox = Mailbox()
+            self._open.append(self._mailbox)
+        mailbox = self._mailbox
+
+        def read():
+            return mailbox.request(tag, arg)[index] * scale
+        return read
+
+
+# === Benchmark ===
+
+def _cost(read, seconds=0.5, limit=100000):
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while count < limit and time.perf_counter() < deadline:
+        read()
+        count += 1
+    return (time.perf_counter() - start) / count
+
+
+# Per-reading cost of every temperature source that works here
+def benchmark():
+    zone = find_cpu_zone()
+    candidates = []
+    if zone:
+        def reopen():
+            with open(zone) as f:
+                return int(f.read()) / 1000.0
+        candidates.append(("sysfs open+read", reopen))
+        candidates.append(("sysfs pread", SysfsValue(zone, scale=0.001).read))
+    try:
+        mailbox = Mailbox()
+        candidates.append(("mailbox ioctl", lambda: mailbox.request(TAG_GET_TEMPERATURE, 0)))
+    except (OSError, ImportError):
+        pass
+    if shutil.which("vcgencmd"):
+        candidates.append(("vcgencmd run", _vcgencmd_temperature))
+        candidates.append(("vcgencmd popen", lambda: os.popen("vcgencmd measure_temp").readline()))
+    if not candidates:
+        print("No temperature source found on this machine")
+    for name, read in candidates:
+        try:
+            print(f"{name:<16} {_cost(read) * 1e6:10.1f} us/reading")
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            print(f"{name:<16} failed: {e}")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        with Sensors() as sensors:
+            flags = sensors.throttled()
+            print("Sources:", sensors.sources)
+            print("Temperature:", sensors.temperature(), "°C")
+            print("ARM clock:", sensors.arm_clock(), "MHz")
+            print("Throttled:", None if flags is None else hex(flags),
+                  describe_throttled(flags) if flags else "")
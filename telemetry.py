@@ -0,0 +1,144 @@
+# Compact binary telemetry for the MQTT senders and receivers. A message is
+# a fixed header and float32 metrics in an order set by its schema:
+#
+#   'T'  schema id  sequence  timestamp  metric, metric, ...
+#   1 B  1 B        uint32    float64    float32 each, little-endian
+#
+# The schema id says which metrics follow, so one topic carries many values
+# and a receiver can tell messages apart without parsing text. decode()
+# still accepts the old plain-text payloads ("48.31").
+#
+#   pub = Publisher(client, "pi5/telemetry", SYSTEM)
+#   pub.publish(cpu_temp=48.3, ram_percent=41.0, load1=0.52, load5=0.4, load15=0.3)
+#
+#   msg = decode(message.payload, default='cpu_temp')
+#   msg['cpu_temp'], msg.seq, msg.time
+import struct
+import time
+
+MAGIC = b'T'
+HEADER = '<cBId'
+NAN = float('nan')  # A metric that could not be read
+
+
+class Schema:
+    def __init__(self, schema_id, names):
+        self.id = schema_id
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.struct = struct.Struct(HEADER + 'f' * len(self.names))
+        self.size = self.struct.size
+
+
+# Known schemas by id. Add new ones with a new id rather than changing one,
+# so receivers running older code can still read what they know
+SCHEMAS = {}
+
+
+def register(schema_id, names):
+    schema = Schema(schema_id, names)
+    SCHEMAS[schema_id] = schema
+    return schema
+
+
+CPU_TEMP = register(1, ['cpu_temp'])
+SYSTEM = register(2, ['cpu_temp', 'ram_percent', 'load1', 'load5', 'load15'])
+# A window of temperature readings; cpu_temp is the mean, so receivers that
+# only know cpu_temp keep working
+WINDOW = register(3, ['cpu_temp', 'cpu_temp_min', 'cpu_temp_max', 'cpu_temp_p95',
+                      'samples', 'ram_percent', 'load1', 'load5', 'load15'])
+
+
+# A decoded message. Metrics are read by name: msg['cpu_temp']
+class Message:
+    __slots__ = ('schema', 'seq', 'time', 'values')
+
+    def __init__(self, schema, seq, timestamp, values):
+        self.schema = schema
+        self.seq = seq  # None for plain-text payloads
+        self.time = timestamp
+        self.values = values
+
+    def __getitem__(self, name):
+        return self.values[self.schema.index[name]]
+
+    def get(self, name, default=None):
+        i = self.schema.index.get(name)
+        return default if i is None else self.values[i]
+
+    def as_dict(self):
+        return dict(zip(self.schema.names, self.values))
+
+
+def encode(schema, seq, timestamp, values):
+    return schema.struct.pack(MAGIC, schema.id, seq & 0xFFFFFFFF, timestamp, *values)
+
+
+# Decode a payload without copying it. Plain-text numbers from senders that
+# have not been updated become a one-metric message named default
+def decode(payload, default='value'):
+    if payload[:1] == MAGIC:
+        if len(payload) < 2 or payload[1] not in SCHEMAS:
+            raise ValueError("Unknown telemetry schema")
+        schema = SCHEMAS[payload[1]]
+        if len(payload) != schema.size:
+            raise ValueError("Telemetry payload has the wrong size")
+        fields = schema.struct.unpack_from(payload)
+        return Message(schema, fields[2], fields[3], fields[4:])
+    value = float(bytes(payload).decode())  # ValueError if not a number
+    return Message(_text_schema(default), None, time.time(), (value,))
+
+
+_TEXT_SCHEMAS = {}
+
+
+def _text_schema(name):
+    schema = _TEXT_SCHEMAS.get(name)
+    if schema is None:
+        schema = _TEXT_SCHEMAS[name] = Schema(0, [name])
+    return schema
+
+
+# Publishes one schema on one topic, numbering the messages. Each payload
+# is packed once and handed to paho as is; paho keeps it for QoS 1/2
+# resends, so it is not reused
+class Publisher:
+    def __init__(self, client, topic, schema, qos=0):
+        self.client = client
+        self.topic = topic
+        self.schema = schema
+        self.qos = qos
+        self.seq = 0
+        self._values = [0.0] * len(schema.names)
+
+    # Metrics by keyword; any left out or None are sent as NaN
+    def publish(self, **metrics):
+        values = self._values
+        for i, name in enumerate(self.schema.names):
+            value = metrics.get(name)
+            values[i] = NAN if value is None else value
+        payload = encode(self.schema, self.seq, time.time(), values)
+        self.seq += 1
+        return self.client.publish(self.topic, payload, qos=self.qos)
+
+
+# Follows the sequence numbers of one sender to count lost messages and
+# restarts
+class Tracker:
+    def __init__(self):
+        self.last = None
+        self.received = 0
+        self.lost = 0
+        self.restarts = 0
+
+    def update(self, msg):
+        self.received += 1
+        if msg.seq is None:
+            return
+        if self.last is not None:
+            gap = (msg.seq - self.last - 1) & 0xFFFFFFFF
+            if msg.seq == 0 or gap > 0x7FFFFFFF:
+                self.restarts += 1  # Sender started again from 0
+            else:
+                self.lost += gap
+        self.last = msg.seq
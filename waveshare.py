@@ -6,10 +6,11 @@ sys.path.append('./lcdlib')  # Adjust if your path is different
 
 import LCD1602
 import time
+from timeline import Timeline
 
 # Initialize LCD and backlight
-lcd = LCD1602.LCD1602(16, 2)
-led = LCD1602.SN3193()
+lcd = LCD1602.LCD1602(16, 2, warm=True)  # Skips the init if already set up
+led = LCD1602.SN3193(warm=True)
 
 # Heart shape (CGRAM slot 0)
 heart_char = [
@@ -37,29 +38,22 @@ try:
     led.set_brightness(90)
     lcd.createChar(0, heart_char)
 
-    scroll_len = max(len(quote), len(hearts)) - 15
     scroll_count = 2  # ✅ scroll only twice now
 
+    # Line 2 repeats the hearts under the whole quote
+    marquee = LCD1602.Marquee(lcd, quote, (hearts * len(quote))[:len(quote)])
+    timeline = Timeline(0.3)  # Frames on fixed deadlines, no drift
     for _ in range(scroll_count):
-        for i in range(scroll_len):
-            # Scroll line 1: quote
-            lcd.setCursor(0, 0)
-            lcd.printout(quote[i:i+16].ljust(16))
-
-            # Scroll line 2: hearts
-            h = hearts[i % len(hearts):] + hearts[:i % len(hearts)]
-            h = (h + " " * 16)[:16]
-            lcd.setCursor(0, 1)
-            lcd.printout(h)
-
-            time.sleep(0.3)
+        for frame in timeline.frames(marquee.steps):
+            marquee.seek(frame)  # Loads DDRAM at frame 0, then one shift per step
+    timeline.wait()  # Hold the last frame for its full period
+    marquee.stop()
 
     # Final blessing message
-    lcd.clear()
-    lcd.setCursor(0, 0)
-    lcd.printout("Have a Blessed")
-    lcd.setCursor(0, 1)
-    lcd.printout("Day.")
+    lcd.clearFrame()
+    lcd.draw(0, 0, "Have a Blessed")
+    lcd.draw(0, 1, "Day.")
+    lcd.flush()
 
     time.sleep(6)
 
@@ -6,10 +6,11 @@ sys.path.append('./lcdlib')  # Adjust if your driver path is different
 
 import LCD1602
 import time
+from timeline import Timeline
 
 # Initialize LCD and backlight
-lcd = LCD1602.LCD1602(16, 2)
-led = LCD1602.SN3193()
+lcd = LCD1602.LCD1602(16, 2, warm=True)  # Skips the init if already set up
+led = LCD1602.SN3193(warm=True)
 
 # Custom heart character (CGRAM slot 0)
 heart_char = [
@@ -34,30 +35,22 @@ try:
     # Load heart shape into CGRAM slot 0
     lcd.createChar(0, heart_char)
 
-    scroll_len = max(len(message), len(hearts)) - 15
     scroll_count = 3
 
-    # Scroll the message and hearts 3 times
+    # Scroll the message and hearts 3 times; line 2 repeats the hearts
+    marquee = LCD1602.Marquee(lcd, message, (hearts * len(message))[:len(message)])
+    timeline = Timeline(0.3)  # Frames on fixed deadlines, no drift
     for _ in range(scroll_count):
-        for i in range(scroll_len):
-            # Line 1: Scrolling birthday message
-            lcd.setCursor(0, 0)
-            lcd.printout(message[i:i+16].ljust(16))
-
-            # Line 2: Scrolling hearts
-            h = hearts[i % len(hearts):] + hearts[:i % len(hearts)]
-            h = (h + " " * 16)[:16]
-            lcd.setCursor(0, 1)
-            lcd.printout(h)
-
-            time.sleep(0.3)
+        for frame in timeline.frames(marquee.steps):
+            marquee.seek(frame)  # Loads DDRAM at frame 0, then one shift per step
+    timeline.wait()  # Hold the last frame for its full period
+    marquee.stop()
 
     # Final blessing message
-    lcd.clear()
-    lcd.setCursor(0, 0)
-    lcd.printout("Have a Blessed")
-    lcd.setCursor(0, 1)
-    lcd.printout("Day.")
+    lcd.clearFrame()
+    lcd.draw(0, 0, "Have a Blessed")
+    lcd.draw(0, 1, "Day.")
+    lcd.flush()
 
     time.sleep(6)
 